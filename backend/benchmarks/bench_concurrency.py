@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+/listings read latency while a scrape ingests, per SQLite storage setup (database.py).
+
+Copies one synthetic database (bench_listings_pagination.build_database) per setup, then
+has paced reader threads (API traffic) run /listings queries, first alone and then while
+another process upserts scrape-sized batches (ingest.upsert_listings) as fast as it can:
+
+    before    one bare engine with SQLite's defaults, as database.py used to create
+    rollback  create_engines(profile="rollback"): writer/reader split, rollback journal
+    wal       create_engines(profile="wal"): WAL, synchronous=NORMAL, mmap, larger cache
+
+Run from the repository root:
+    python backend/benchmarks/bench_concurrency.py --rows 500000 --seconds 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from bench_listings_pagination import BRANDS, FUELS, PLATFORMS, build_database
+from backend.database import create_engines
+from backend.ingest import upsert_listings
+from backend.models import Listing
+from backend.queries import filter_listings, listings_page
+
+SETUPS = ['before', 'rollback', 'wal']
+
+# filter_listings keyword arguments, cycled through by the readers
+READ_FILTERS = [{}, {'platform': 'olx'}, {'brand': 'BMW', 'model': 'Seria 3'}, {'fuel_type': 'Diesel', 'min_year': 2015}]
+
+# Pause of each reader between two requests
+READ_INTERVAL = 0.01
+
+
+def engines_for(setup: str, path: str):
+    url = f"sqlite:///{path}"
+    if setup == 'before':
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        return engine, engine
+    return create_engines(url, setup)
+
+
+def ingest(setup: str, path: str, seconds: float, rows: int, results):
+    """
+    Writer process: batches of 400 new and 100 re-priced listings until `seconds` pass,
+    each new batch of one brand and model, like the results of one search.
+    """
+    writer, _ = engines_for(setup, path)
+    db = sessionmaker(bind=writer)()
+    rng = random.Random(1)
+    brands = list(BRANDS)
+    batches = errors = serial = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        items = []
+        brand = rng.choice(brands)
+        model = rng.choice(BRANDS[brand])
+        for _ in range(400):
+            serial += 1
+            items.append({'source_id': f"NEW{serial}", 'source_url': f"https://example.com/new/{serial}",
+                          'platform': rng.choice(PLATFORMS), 'brand': brand, 'model': model,
+                          'production_year': rng.randint(2000, 2024), 'fuel_type': rng.choice(FUELS),
+                          'price': rng.randint(10, 300) * 1000, 'mileage': rng.randint(0, 350) * 1000})
+        for _ in range(100):
+            items.append({'source_id': f"ID{rng.randrange(rows)}", 'price': rng.randint(10, 300) * 1000})
+        try:
+            upsert_listings(db, items)
+            batches += 1
+        except OperationalError:
+            errors += 1
+    db.close()
+    results.put((batches, errors))
+
+
+def read(read_engine, seconds: float, latencies, errors):
+    db = sessionmaker(bind=read_engine)()
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        filters = READ_FILTERS[i % len(READ_FILTERS)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            listings_page(filter_listings(db.query(Listing), **filters), limit=100)
+            db.rollback()
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            db.rollback()
+            errors.append(time.perf_counter() - started)
+        db.expunge_all()
+        time.sleep(READ_INTERVAL)
+    db.close()
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000 if ordered else float('nan')
+
+
+def measure(read_engine, readers: int, seconds: float):
+    latencies, errors = [], []
+    threads = [threading.Thread(target=read, args=(read_engine, seconds, latencies, errors)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /listings reads under a concurrent ingest')
+    parser.add_argument('--rows', type=int, default=500_000, help='Listings in the database')
+    parser.add_argument('--seconds', type=float, default=10, help='Duration of each measurement')
+    parser.add_argument('--readers', type=int, default=4, help='Reader threads')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    base = os.path.join(workdir, 'base.db')
+    build_database(base, args.rows)
+    print(f"{args.rows} listings, {args.readers} readers, {args.seconds:.0f}s per run")
+    print(f"\n  {'setup':9s} {'ingest':7s} {'reads':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} "
+          f"{'max ms':>8s} {'errors':>7s} {'batches':>8s}")
+
+    for setup in SETUPS:
+        path = os.path.join(workdir, f"{setup}.db")
+        shutil.copy(base, path)
+        writer, reader = engines_for(setup, path)
+        with writer.connect():
+            pass  # the writer applies the profile's journal mode before anyone reads
+
+        for ingesting in (False, True):
+            batches = ingest_errors = '-'
+            if ingesting:
+                results = multiprocessing.Queue()
+                process = multiprocessing.Process(target=ingest, args=(setup, path, args.seconds, args.rows, results))
+                process.start()
+            latencies, errors = measure(reader, args.readers, args.seconds)
+            if ingesting:
+                batches, ingest_errors = results.get()
+                process.join()
+            print(f"  {setup:9s} {'yes' if ingesting else 'no':7s} {len(latencies):7d} {percentile(latencies, 50):8.1f} "
+                  f"{percentile(latencies, 95):8.1f} {percentile(latencies, 99):8.1f} "
+                  f"{max(latencies, default=0) * 1000:8.1f} {len(errors):7d} {batches:>8}"
+                  + (f" ({ingest_errors} failed)" if ingest_errors not in ('-', 0) else ''))
+        writer.dispose()
+        reader.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Speed and accuracy of cross-platform duplicate detection (dedup.py).
+
+Synthetic cars are listed on one to three platforms with slightly different mileage,
+price and location text. The blocking index is compared with an all-pairs scan using
+the same match rules, and its clusters with the known ground truth.
+
+Run from the backend directory:
+    python benchmarks/bench_dedup.py --cars 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_parse import CARS
+from dedup import DuplicateIndex, index_entry, same_car, vehicle_fingerprint
+
+PLATFORMS = ('otomoto', 'olx', 'autoplac')
+CITIES = ('Warszawa', 'Kraków', 'Gdańsk', 'Poznań', 'Wrocław', 'Łódź')
+
+
+def synthetic_listings(count: int, seed: int = 0):
+    """
+    (listings in scrape order, car number per source_id).
+    """
+    rng = random.Random(seed)
+    listings = []
+    truth = {}
+    for car in range(count):
+        brand, model = CARS[car % len(CARS)][:2]
+        year = rng.randint(2005, 2024)
+        mileage = rng.randint(5, 300) * 1000 + rng.randint(0, 999)
+        price = rng.randint(15, 200) * 1000
+        city = rng.choice(CITIES)
+        for platform in rng.sample(PLATFORMS, rng.choice((1, 1, 2, 3))):
+            source_id = f"{platform}-{car}"
+            truth[source_id] = car
+            listings.append({
+                'source_id': source_id,
+                'platform': platform,
+                'brand': brand,
+                'model': model,
+                'production_year': year,
+                'mileage': mileage + rng.randint(0, 500),
+                'price': round(price * rng.uniform(0.99, 1.01)),
+                'location': city if platform != 'olx' else f"{city} - Dziś o 12:30",
+            })
+    rng.shuffle(listings)
+    return listings, truth
+
+
+def all_pairs(listings):
+    # Same rules, but every listing is checked against every earlier one
+    clusters = {}
+    entries = []
+    for listing in listings:
+        key = vehicle_fingerprint(listing)
+        entry = index_entry(listing)
+        match = next((cluster_id for other_key, other, cluster_id in entries
+                      if other_key == key and key and same_car(entry, other)), None)
+        cluster_id = clusters[listing['source_id']] = match or listing['source_id']
+        entries.append((key, entry, cluster_id))
+    return clusters
+
+
+def pair_scores(index: DuplicateIndex, truth):
+    by_cluster = {}
+    for source_id, cluster_id in index.clusters.items():
+        by_cluster.setdefault(cluster_id, []).append(source_id)
+    found = {(a, b) for members in by_cluster.values() for a in members for b in members if a < b}
+    by_car = {}
+    for source_id, car in truth.items():
+        by_car.setdefault(car, []).append(source_id)
+    expected = {(a, b) for members in by_car.values() for a in members for b in members if a < b}
+    correct = len(found & expected)
+    precision = correct / len(found) if found else 1.0
+    recall = correct / len(expected) if expected else 1.0
+    return precision, recall
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cross-platform duplicate detection')
+    parser.add_argument('--cars', type=int, default=20000, help='Distinct synthetic cars')
+    parser.add_argument('--baseline-cars', type=int, default=1000, help='Cars for the all-pairs comparison')
+    args = parser.parse_args()
+
+    listings, truth = synthetic_listings(args.cars)
+    started = time.perf_counter()
+    index = DuplicateIndex()
+    for listing in listings:
+        index.add(listing)
+    elapsed = time.perf_counter() - started
+    precision, recall = pair_scores(index, truth)
+    print(f"Blocking index: {len(listings)} listings in {elapsed:.2f}s "
+          f"({elapsed / len(listings) * 1e6:.1f} us/listing)")
+    print(f"  {index.report()}")
+    print(f"  all-pairs would compare {len(listings) * (len(listings) - 1) // 2} pairs")
+    print(f"  pair precision {precision:.3f}, recall {recall:.3f}")
+
+    small, _ = synthetic_listings(args.baseline_cars)
+    started = time.perf_counter()
+    blocked = DuplicateIndex()
+    for listing in small:
+        blocked.add(listing)
+    blocked_elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    baseline = all_pairs(small)
+    baseline_elapsed = time.perf_counter() - started
+    same = blocked.clusters == baseline
+    print(f"\n{len(small)} listings: blocking {blocked_elapsed * 1000:.1f} ms, "
+          f"all-pairs {baseline_elapsed * 1000:.1f} ms, clusters {'identical' if same else 'DIFFER'}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
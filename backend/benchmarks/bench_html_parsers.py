@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Parse time and output parity of the HTML parser backends (scrapers/html_parsing.py).
+
+Every installed backend parses the same result pages' cards; its listings and next-page
+URL must equal what "html.parser" produces. Pages that also embed JSON state (otomoto's
+__NEXT_DATA__, olx's __PRERENDERED_STATE__) are parsed both ways, and the embedded
+listings must agree with the cards on COMPARED_FIELDS. Pages are synthetic, plus the
+saved pages in --fixtures (files named <platform>*.html, default: tests/fixtures; the
+same pages tests/test_html_parsing.py checks).
+
+Run from the backend directory:
+    python benchmarks/bench_html_parsers.py --cards 60
+
+Exits with status 1 when any backend's output differs.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_parse import CARS, CARDS
+from scrapers.html_parsing import BACKENDS, is_available, parse_html
+from scrapers.otomoto import OtomotoScraper
+from scrapers.olx import OLXScraper
+from scrapers.autoplac import AutoplacScraper
+
+SCRAPERS = {'otomoto': OtomotoScraper, 'olx': OLXScraper, 'autoplac': AutoplacScraper}
+
+# Fields the embedded JSON and the cards must agree on
+COMPARED_FIELDS = ('source_id', 'source_url', 'price', 'production_year', 'mileage', 'engine_capacity', 'fuel_type')
+
+# Roughly what surrounds the cards on a real page: inline state, navigation, footer
+PAGE_TEMPLATE = """<!DOCTYPE html><html><head><title>Wyniki</title>
+<script>window.__STATE__ = {state};</script>{embedded}<style>{style}</style></head>
+<body><header><nav>{nav}</nav></header><main>{cards}</main>
+<a data-cy="pagination-forward" class="next" href="?page=2">Następna</a>
+<footer>{nav}</footer></body></html>"""
+
+
+def _slug(brand: str, model: str) -> str:
+    return f"{brand}-{model}".lower().replace(" ", "-")
+
+
+def embedded_state(platform: str, count: int) -> str:
+    """
+    The JSON state script a platform embeds, describing the same cars as the cards.
+    """
+    cars = [(i, CARS[i % len(CARS)]) for i in range(count)]
+    if platform == 'otomoto':
+        edges = [{'node': {
+            'id': str(i),
+            'title': f"{brand} {model} 2.0 TDI",
+            'url': f"https://www.otomoto.pl/osobowe/oferta/{_slug(brand, model)}-ID{i}.html",
+            'price': {'amount': {'units': 45900, 'currencyCode': 'PLN'}},
+            'location': {'city': {'name': 'Warszawa'}},
+            'parameters': [
+                {'key': 'make', 'value': brand.lower(), 'displayValue': brand},
+                {'key': 'model', 'value': model.lower(), 'displayValue': model},
+                {'key': 'year', 'value': str(year), 'displayValue': str(year)},
+                {'key': 'mileage', 'value': '150000', 'displayValue': '150 000 km'},
+                {'key': 'engine_capacity', 'value': '1968', 'displayValue': '1 968 cm3'},
+                {'key': 'engine_power', 'value': '150', 'displayValue': '150 KM'},
+                {'key': 'fuel_type', 'value': fuel.lower(), 'displayValue': fuel},
+                {'key': 'body_type', 'value': body.lower(), 'displayValue': body},
+                {'key': 'color', 'value': color.lower(), 'displayValue': color},
+            ],
+        }} for i, (brand, model, year, fuel, body, color) in cars]
+        data = {'advertSearch': {'edges': edges}}
+        next_data = {'props': {'pageProps': {'urqlState': {'1': {'data': json.dumps(data)}}}}}
+        return f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data)}</script>'
+    if platform == 'olx':
+        ads = [{
+            'id': i,
+            'title': f"{brand} {model} {year} 150 000 km {fuel} 1968 cm3",
+            'url': f"https://www.olx.pl/d/oferta/{_slug(brand, model)}-ID{i}.html",
+            'price': {'regularPrice': {'value': 45900, 'currencyCode': 'PLN'}},
+            'location': {'cityName': 'Kraków'},
+            'params': [
+                {'key': 'year', 'value': str(year), 'normalizedValue': str(year)},
+                {'key': 'milage', 'value': '150 000 km', 'normalizedValue': '150000'},
+                {'key': 'petrol', 'value': fuel, 'normalizedValue': fuel.lower()},
+                {'key': 'enginesize', 'value': '1 968 cm³', 'normalizedValue': '1968'},
+            ],
+        } for i, (brand, model, year, fuel, body, color) in cars]
+        state = json.dumps({'listing': {'listing': {'ads': ads}}})
+        return f'<script>window.__PRERENDERED_STATE__= {json.dumps(state)};</script>'
+    return ''
+
+
+def synthetic_page(platform: str, count: int) -> str:
+    _, template = CARDS[platform]
+    cards = "".join(
+        template.format(id=i, slug=_slug(brand, model), brand=brand, model=model,
+                        year=year, fuel=fuel, body=body, color=color)
+        for i, (brand, model, year, fuel, body, color) in ((i, CARS[i % len(CARS)]) for i in range(count))
+    )
+    return PAGE_TEMPLATE.format(
+        embedded=embedded_state(platform, count),
+        state='{"items": [' + ",".join('{"id": %d}' % i for i in range(count * 20)) + ']}',
+        style=".card { color: red; }\n" * 200,
+        nav="".join(f'<a href="/kategoria/{i}">Kategoria {i}</a>' for i in range(200)),
+        cards=cards,
+    )
+
+
+def load_pages(args):
+    pages = [(platform, f"synthetic ({args.cards} cards)", synthetic_page(platform, args.cards)) for platform in SCRAPERS]
+    if args.fixtures:
+        for path in sorted(Path(args.fixtures).glob('*.html')):
+            platform = next((p for p in SCRAPERS if path.name.startswith(p)), None)
+            if platform:
+                pages.append((platform, path.name, path.read_text(encoding='utf-8')))
+    return pages
+
+
+def run(scraper, backend: str, content: str, url: str, extract: str = 'dom'):
+    return scraper.parse_content(content, url, backend, extract)
+
+
+def timed(repeat: int, *args):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = run(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return output, best
+
+
+def project(listings):
+    return [tuple(listing.get(field) for field in COMPARED_FIELDS) for listing in listings]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare HTML parser backends')
+    parser.add_argument('--cards', type=int, default=60, help='Cards per synthetic page')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed passes, best one is reported')
+    parser.add_argument('--fixtures', default=str(Path(__file__).resolve().parent.parent / 'tests' / 'fixtures'),
+                        help='Directory of saved result pages')
+    args = parser.parse_args()
+
+    backends = [backend for backend in BACKENDS if is_available(backend)]
+    print(f"Backends installed: {', '.join(backends)}")
+
+    mismatches = 0
+    for platform, name, content in load_pages(args):
+        scraper = SCRAPERS[platform]()
+        url = f"https://example.com/{platform}/search"
+        expected = run(scraper, 'html.parser', content, url)
+        print(f"\n{platform} - {name}: {len(expected[0])} listings, {len(content) // 1024} KB")
+
+        for backend in backends:
+            output, best = timed(args.repeat, scraper, backend, content, url)
+            same = output == expected
+            mismatches += not same
+            print(f"  {backend:12s} {best * 1000:8.2f} ms/page  {'identical' if same else 'DIFFERS'}")
+
+        embedded = scraper.parse_embedded(parse_html(content, backends[0]))
+        if embedded:
+            output, best = timed(args.repeat, scraper, backends[0], content, url, 'auto')
+            same = project(output[0]) == project(expected[0]) and output[1] == expected[1]
+            mismatches += not same
+            print(f"  {'embedded':12s} {best * 1000:8.2f} ms/page  {'agrees' if same else 'DIFFERS'} "
+                  f"({backends[0]}, {len(output[0])} listings from JSON state)")
+
+    if mismatches:
+        print(f"\n{mismatches} backend/page combinations differ from html.parser")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
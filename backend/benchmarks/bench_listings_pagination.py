@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Deep-page latency of /listings: OFFSET paging vs keyset (cursor) paging, on SQLite.
+
+Builds a database of synthetic listings with the real schema and indexes (models.py),
+then times one page at increasing depths with both strategies, with and without the
+endpoint's filters, using the same query code as the API (queries.py).
+
+Run from the repository root (the backend package is imported as `backend`):
+    python backend/benchmarks/bench_listings_pagination.py --rows 2000000 --db /tmp/bench_listings.db
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.database import Base
+from backend.dedup import fingerprint_key
+from backend.models import Listing
+from backend.queries import filter_listings, listings_page
+
+BRANDS = {
+    'BMW': ['Seria 3', 'Seria 5', 'X3'],
+    'Volkswagen': ['Golf', 'Passat', 'Tiguan'],
+    'Toyota': ['Corolla', 'RAV4', 'Yaris'],
+    'Audi': ['A4', 'A6', 'Q5'],
+    'Skoda': ['Octavia', 'Superb', 'Fabia'],
+}
+FUELS = ['Benzyna', 'Diesel', 'Hybryda', 'LPG']
+PLATFORMS = ['otomoto', 'olx', 'autoplac']
+
+# Name -> filter_listings keyword arguments
+FILTERS = {
+    'none': {},
+    'platform': {'platform': 'olx'},
+    'brand+model': {'brand': 'BMW', 'model': 'Seria 3'},
+    'brand+model+ranges': {'brand': 'BMW', 'model': 'Seria 3', 'min_year': 2015, 'max_mileage': 200000,
+                           'min_price': 30000, 'max_price': 120000},
+}
+
+
+def build_database(path: str, rows: int, batch_size: int = 500, days: Optional[float] = None):
+    """
+    Schema from models.py, rows inserted in scrape-sized batches sharing a timestamp, like upserts do.
+    Batches are a minute apart, or spread evenly over `days` days.
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(0)
+    started_at = datetime(2024, 1, 1)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=OFF")
+    connection.execute("PRAGMA synchronous=OFF")
+    brands = list(BRANDS)
+    batches = max(1, -(-rows // batch_size))
+    interval = timedelta(days=days) / batches if days else timedelta(minutes=1)
+    insert = ("INSERT INTO listings (source_id, source_url, platform, brand, model, production_year, fuel_type, "
+              "price, currency, mileage, status, scraped_at, fingerprint) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'PLN', ?, 'active', ?, ?)")
+    for start in range(0, rows, batch_size):
+        scraped_at = (started_at + interval * (start // batch_size)).strftime('%Y-%m-%d %H:%M:%S')
+        batch = []
+        for i in range(start, min(start + batch_size, rows)):
+            brand = rng.choice(brands)
+            model, year = rng.choice(BRANDS[brand]), rng.randint(2000, 2024)
+            batch.append((f"ID{i}", f"https://example.com/{i}", rng.choice(PLATFORMS), brand, model, year,
+                          rng.choice(FUELS), rng.randint(10, 300) * 1000, rng.randint(0, 350) * 1000, scraped_at,
+                          fingerprint_key({'brand': brand, 'model': model, 'production_year': year})))
+        connection.executemany(insert, batch)
+    connection.commit()
+    connection.execute("ANALYZE")
+    connection.close()
+
+
+def timed(function, repeat: int):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OFFSET vs keyset paging of /listings')
+    parser.add_argument('--rows', type=int, default=2_000_000, help='Listings in the database')
+    parser.add_argument('--db', help='Database file, reused when it already exists (default: a temporary file)')
+    parser.add_argument('--limit', type=int, default=100, help='Page size')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per page, best one is reported')
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'bench_listings.db')
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        build_database(path, args.rows)
+        print(f"Built {args.rows} listings in {time.perf_counter() - started:.1f}s ({path})")
+
+    engine = create_engine(f"sqlite:///{path}")
+    db = sessionmaker(bind=engine)()
+    total = db.query(Listing).count()
+    print(f"{total} listings, page size {args.limit}")
+
+    for name, filters in FILTERS.items():
+        matching = filter_listings(db.query(Listing), **filters).count()
+        print(f"\nfilter {name}: {matching} matching listings")
+        print(f"  {'depth':>10s} {'offset ms':>10s} {'keyset ms':>10s}  same rows")
+        for fraction in (0, 0.01, 0.1, 0.5, 0.9):
+            skip = int(matching * fraction)
+            cursor = None
+            if skip:
+                # The id a client would hold after reading `skip` rows page by page
+                before = listings_page(filter_listings(db.query(Listing), **filters), skip=skip - 1, limit=1)
+                cursor = before[0].id
+            offset_rows, offset_time = timed(
+                lambda: listings_page(filter_listings(db.query(Listing), **filters), skip=skip, limit=args.limit), args.repeat)
+            keyset_rows, keyset_time = timed(
+                lambda: listings_page(filter_listings(db.query(Listing), **filters), cursor=cursor, limit=args.limit), args.repeat)
+            same = [row.id for row in offset_rows] == [row.id for row in keyset_rows]
+            print(f"  {skip:>10d} {offset_time * 1000:10.2f} {keyset_time * 1000:10.2f}  {'yes' if same else 'NO'}")
+            db.expunge_all()
+
+    # Which index each filter's ordered scan uses
+    print("\nQuery plans:")
+    connection = engine.raw_connection()
+    for name, filters in FILTERS.items():
+        statement = filter_listings(db.query(Listing.id), **filters).order_by(Listing.scraped_at.desc(), Listing.id.desc())
+        sql = str(statement.statement.compile(engine, compile_kwargs={'literal_binds': True}))
+        plan = "; ".join(row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}"))
+        print(f"  {name:20s} {plan}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Analyst workload: per-brand price statistics from an indented listings.json (json.load,
+then a pass in Python) vs from the Parquet export (columnar.price_stats, memory-mapped).
+
+Run from the repository root:
+    python backend/benchmarks/bench_parquet.py --rows 500000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_listings_pagination import BRANDS, FUELS, PLATFORMS
+from columnar import export_parquet, price_stats
+
+
+def make_listings(rows: int):
+    rng = random.Random(0)
+    started_at = datetime(2024, 1, 1)
+    brands = list(BRANDS)
+    for i in range(rows):
+        brand = rng.choice(brands)
+        yield {
+            'source_id': f"ID{i}",
+            'source_url': f"https://example.com/{i}",
+            'platform': rng.choice(PLATFORMS),
+            'brand': brand,
+            'model': rng.choice(BRANDS[brand]),
+            'production_year': rng.randint(2000, 2024),
+            'fuel_type': rng.choice(FUELS),
+            'power': rng.randint(70, 400),
+            'price': rng.randint(10, 300) * 1000,
+            'currency': 'PLN',
+            'mileage': rng.randint(0, 350) * 1000,
+            'location': 'Warszawa',
+            'status': 'active',
+            'scraped_at': (started_at + timedelta(minutes=i // 50)).isoformat(),
+        }
+
+
+def json_stats(path: str):
+    with open(path, encoding='utf-8') as f:
+        listings = json.load(f)
+    groups = {}
+    for listing in listings:
+        if listing.get('price'):
+            groups.setdefault(listing['brand'], []).append(listing['price'])
+    return {brand: sorted(prices)[len(prices) // 2] for brand, prices in groups.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark listings.json vs the Parquet export')
+    parser.add_argument('--rows', type=int, default=500_000, help='Listings generated')
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    json_path = workdir / 'listings.json'
+    parquet_dir = workdir / 'parquet'
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(list(make_listings(args.rows)), f, ensure_ascii=False, indent=2)
+    started = time.perf_counter()
+    export_parquet(make_listings(args.rows), str(parquet_dir))
+    export_time = time.perf_counter() - started
+    parquet_bytes = sum(os.path.getsize(path) for path in parquet_dir.rglob('*.parquet'))
+    print(f"{args.rows} listings: listings.json {os.path.getsize(json_path) // 2**20} MB, "
+          f"Parquet {parquet_bytes // 2**20} MB (exported in {export_time:.1f}s)")
+
+    started = time.perf_counter()
+    json_stats(str(json_path))
+    json_time = time.perf_counter() - started
+    started = time.perf_counter()
+    price_stats(str(parquet_dir), 'brand')
+    parquet_time = time.perf_counter() - started
+
+    print(f"Per-brand price statistics: listings.json {json_time:.2f}s, Parquet {parquet_time:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
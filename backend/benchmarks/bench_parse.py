@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Per-card parse cost of each scraper's parse_listing, on synthetic listing cards.
+
+Run from the backend directory:
+    python benchmarks/bench_parse.py --cards 2000
+
+With --baseline-rev the scrapers as of that git revision are timed on the same cards,
+e.g. the initial commit:
+    python benchmarks/bench_parse.py --baseline-rev $(git rev-list --max-parents=0 HEAD)
+"""
+
+import argparse
+import importlib
+import io
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+from scrapers.otomoto import OtomotoScraper
+from scrapers.olx import OLXScraper
+from scrapers.autoplac import AutoplacScraper
+
+CARS = [
+    ("Volkswagen", "Golf", 2017, "Benzyna", "Hatchback", "Srebrny"),
+    ("BMW", "Seria 3", 2019, "Diesel", "Sedan", "Czarny"),
+    ("Alfa Romeo", "Giulia", 2020, "Benzyna", "Sedan", "Czerwony"),
+    ("Toyota", "Corolla", 2015, "Hybryda", "Kombi", "Biały"),
+    ("Land Rover", "Discovery", 2016, "Diesel", "SUV", "Zielony"),
+]
+
+CARDS = {
+    "otomoto": (
+        "article[data-testid='listing-ad']",
+        """<article data-testid="listing-ad"><h2><a href="https://www.otomoto.pl/osobowe/oferta/{slug}-ID{id}.html">{brand} {model} 2.0 TDI</a></h2>
+        <p>{year} · 150 000 km · 1 968 cm3 · 150 KM · {fuel} · {body} · {color}</p>
+        <h3>45 900 PLN</h3><p data-testid="location">Warszawa</p><p data-testid="date">Dziś</p></article>""",
+    ),
+    "olx": (
+        "div[data-cy='l-card']",
+        """<div data-cy="l-card"><a data-cy="listing-ad-title" href="/d/oferta/{slug}-ID{id}.html">{brand} {model} {year} 150 000 km {fuel} 1968 cm3</a>
+        <p data-testid="ad-price">45 900 zł</p><p data-testid="location-date">Kraków - Dziś o 12:30</p></div>""",
+    ),
+    "autoplac": (
+        "div.offer-item",
+        """<div class="offer-item" data-offer-id="{id}"><h3 class="offer-title"><a class="offer-link" href="/oferta/{id}">{brand} {model}</a></h3>
+        <ul><li>{year}</li><li>150 000 km</li><li>1 968 cm3</li><li>150 KM</li><li>{fuel}</li></ul>
+        <span class="offer-price">45 900 zł</span><span class="offer-location">Gdańsk</span></div>""",
+    ),
+}
+
+
+def build_cards(platform: str, count: int):
+    selector, template = CARDS[platform]
+    html = "".join(
+        template.format(id=i, slug=f"{brand}-{model}".lower().replace(" ", "-"), brand=brand, model=model,
+                        year=year, fuel=fuel, body=body, color=color)
+        for i, (brand, model, year, fuel, body, color) in ((i, CARS[i % len(CARS)]) for i in range(count))
+    )
+    return BeautifulSoup(f"<html><body>{html}</body></html>", "html.parser").select(selector)
+
+
+def load_baseline(rev: str):
+    """
+    The scrapers of `rev`, imported from a temporary copy as package baseline_scrapers.
+    """
+    archive = subprocess.run(['git', 'archive', rev, 'scrapers'], cwd=Path(__file__).resolve().parent.parent,
+                             check=True, capture_output=True).stdout
+    workdir = Path(tempfile.mkdtemp())
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(workdir)
+    (workdir / 'scrapers').rename(workdir / 'baseline_scrapers')
+    sys.path.insert(0, str(workdir))
+    return {
+        'otomoto': importlib.import_module('baseline_scrapers.otomoto').OtomotoScraper(),
+        'olx': importlib.import_module('baseline_scrapers.olx').OLXScraper(),
+        'autoplac': importlib.import_module('baseline_scrapers.autoplac').AutoplacScraper(),
+    }
+
+
+def time_cards(scraper, cards, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for card in cards:
+            scraper.parse_listing(card)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6 / len(cards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parse_listing per platform')
+    parser.add_argument('--cards', type=int, default=2000, help='Cards per platform')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed passes, best one is reported')
+    parser.add_argument('--baseline-rev', help='Also time the scrapers of this git revision')
+    args = parser.parse_args()
+
+    scrapers = {'otomoto': OtomotoScraper(), 'olx': OLXScraper(), 'autoplac': AutoplacScraper()}
+    baseline = load_baseline(args.baseline_rev) if args.baseline_rev else {}
+    for platform, scraper in scrapers.items():
+        cards = build_cards(platform, args.cards)
+        current = time_cards(scraper, cards, args.repeat)
+        line = f"{platform:10s} {len(cards)} cards  {current:8.1f} µs/card"
+        if platform in baseline:
+            before = time_cards(baseline[platform], cards, args.repeat)
+            line += f"   baseline {before:8.1f} µs/card   {before / current:4.1f}x"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+/stats latency: the exact GROUP BY over the listings vs the merged daily rollups.
+
+Builds the synthetic database of bench_listings_pagination.py with its listings spread
+over --days days (the rollups grow with the days, not the listings), rebuilds its rollups
+(stats.rebuild_rollups) and times both paths for every dimension.
+
+Run from the repository root:
+    python backend/benchmarks/bench_stats.py --rows 1000000 --days 180 --db /tmp/bench_stats.db
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from bench_listings_pagination import build_database
+from backend.models import Listing, DailyRollup
+from backend.stats import DIMENSIONS, price_stats, rollup_stats, rebuild_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark exact vs rollup /stats queries')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Listings in the database')
+    parser.add_argument('--days', type=float, default=180, help='Days the listings were first seen over')
+    parser.add_argument('--db', help='Database file, reused when it already exists (default: a temporary file)')
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'bench_stats.db')
+    if not os.path.exists(path):
+        build_database(path, args.rows, days=args.days)
+    db = sessionmaker(bind=create_engine(f"sqlite:///{path}"))()
+
+    started = time.perf_counter()
+    rollup_rows = rebuild_rollups(db)
+    sketch_bytes = db.query(func.sum(func.length(DailyRollup.sketch))).scalar() or 0
+    print(f"{db.query(Listing).count()} listings -> {rollup_rows} rollup rows "
+          f"({sketch_bytes // 1024} KB of sketches), rebuilt in {time.perf_counter() - started:.1f}s")
+
+    print(f"\n  {'dimension':10s} {'exact ms':>10s} {'rollups ms':>11s} {'groups':>7s}  max median error")
+    for dimension in DIMENSIONS:
+        started = time.perf_counter()
+        exact = price_stats(db, dimension)
+        exact_time = time.perf_counter() - started
+        started = time.perf_counter()
+        rolled = rollup_stats(db, dimension)
+        rollup_time = time.perf_counter() - started
+
+        medians = {row[dimension]: row['medianPrice'] for row in exact}
+        error = max((abs(row['medianPrice'] - medians[row[dimension]]) / medians[row[dimension]]
+                     for row in rolled if row[dimension] in medians), default=0.0)
+        print(f"  {dimension:10s} {exact_time * 1000:10.1f} {rollup_time * 1000:11.1f} {len(rolled):7d}  {error:.2%}")
+
+
+if __name__ == '__main__':
+    main()
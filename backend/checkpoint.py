@@ -0,0 +1,107 @@
+"""
+Crawl checkpoints, so an interrupted multi-page run continues where it stopped.
+
+The state file holds the ID of the run that wrote it and one entry per (platform, search URL):
+    {"next_page": 7, "next_url": "...?page=8", "done": false, "seen_ids": ["ID1", ...]}
+
+With a run ID, only a checkpoint written under the same ID is resumed: a re-attempt of
+a failed CI run continues it, the next scheduled run starts over instead of crawling
+from a day-old cursor.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+
+class CrawlCheckpoint:
+    """
+    Pagination cursor and seen listing IDs per config entry, saved after every stored page.
+
+    The cursor only moves once a page's listings have been saved, so resuming never
+    skips a page whose data was lost. The file is removed when every entry finishes.
+    """
+
+    def __init__(self, path: str, run_id: Optional[str] = None):
+        self.path = Path(path)
+        self.run_id = run_id
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def key(platform: str, search_url: str) -> str:
+        return f"{platform} {search_url}"
+
+    def load(self) -> bool:
+        """
+        Reads the state file. Returns False when there is nothing to resume, including
+        a checkpoint left by another run.
+        """
+        if not self.path.exists():
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (ValueError, OSError) as e:
+            print(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            state = {}
+        if self.run_id and state.get('run_id') != self.run_id:
+            if state.get('entries'):
+                print(f"Ignoring the checkpoint of run {state.get('run_id')} in {self.path}")
+            state = {}
+        self.entries = state.get('entries', {})
+        return bool(self.entries)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'run_id': self.run_id, 'updated_at': datetime.now().isoformat(), 'entries': self.entries}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    def begin(self, entries: List[Tuple[str, str]]):
+        """
+        Registers this run's (platform, search_url) entries; entries from other runs are dropped.
+        """
+        keys = [self.key(platform, search_url) for platform, search_url in entries]
+        self.entries = {key: self.entries.get(key) or self._new_entry() for key in keys}
+        self.save()
+
+    @staticmethod
+    def _new_entry() -> Dict[str, Any]:
+        return {'next_page': 0, 'next_url': None, 'done': False, 'seen_ids': []}
+
+    def start(self, platform: str, search_url: str) -> Tuple[int, Optional[str], bool]:
+        """
+        (page to start at, URL to start at, already done) for an entry.
+        """
+        entry = self.entries.get(self.key(platform, search_url))
+        if entry is None:
+            return 0, None, False
+        return entry['next_page'], entry['next_url'], entry['done']
+
+    def seen_ids(self, platform: str, search_url: str) -> List[str]:
+        return self.entries.get(self.key(platform, search_url), {}).get('seen_ids', [])
+
+    def record_page(self, platform: str, search_url: str, page_num: int, next_url: Optional[str],
+                    source_ids: List[str]):
+        entry = self.entries.setdefault(self.key(platform, search_url), self._new_entry())
+        entry['next_page'] = page_num + 1
+        entry['next_url'] = next_url
+        entry['seen_ids'].extend(source_ids)
+        self.save()
+
+    def finish(self, platform: str, search_url: str):
+        entry = self.entries.setdefault(self.key(platform, search_url), self._new_entry())
+        entry['done'] = True
+        if all(e['done'] for e in self.entries.values()):
+            self.clear()
+        else:
+            self.save()
+
+    def clear(self):
+        self.entries = {}
+        if self.path.exists():
+            self.path.unlink()
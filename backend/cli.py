@@ -1,133 +1,382 @@
 #!/usr/bin/env python3
 """
-CLI for running car scrapers and saving data to JSON.
+CLI for running car scrapers and saving data to an append-only JSON Lines store.
 This is designed to be run by GitHub Actions or locally.
 """
 
 import asyncio
+import contextlib
 import json
 import argparse
 import sys
+import time
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple, AsyncIterator
 from playwright.async_api import async_playwright
 
 # Import scrapers
 from scrapers.otomoto import OtomotoScraper
 from scrapers.olx import OLXScraper
 from scrapers.autoplac import AutoplacScraper
+from scrapers.browser_pool import BrowserPool
+from scrapers.throttle import DomainRateLimiter
+from scrapers.parse_pool import ParsePool
+from scrapers.page_cache import PageCache, DEFAULT_TTL_DAYS, DEFAULT_MAX_BYTES
+from scrapers.base import ScrapedPage
+from storage import SegmentStore
+from checkpoint import CrawlCheckpoint
+from export import export_static
+from columnar import export_parquet
+
+# Defaults used when scraper_config.json does not set its own limits
+DEFAULT_MAX_CONCURRENCY = 3
+DEFAULT_PLATFORM_CONCURRENCY = 1
+# Parsed pages waiting to be saved; scrapers pause when this many are queued
+DEFAULT_QUEUE_SIZE = 8
+# Incremental crawls stop an entry after `patience` pages in a row with at least
+# this share of listings already in the store
+DEFAULT_STOP_THRESHOLD = 0.8
+DEFAULT_STOP_PATIENCE = 1
 
 
 class ScraperCLI:
-    def __init__(self):
+    def __init__(self, max_pages_per_browser: int = 50, parse_workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None, cache_ttl_days: int = DEFAULT_TTL_DAYS,
+                 cache_max_bytes: int = DEFAULT_MAX_BYTES):
+        # One rate limiter for every scraper, so concurrent runs share each domain's budget
+        self.rate_limiter = DomainRateLimiter()
         self.scrapers = {
-            'otomoto': OtomotoScraper(),
-            'olx': OLXScraper(),
-            'autoplac': AutoplacScraper()
+            'otomoto': OtomotoScraper(self.rate_limiter),
+            'olx': OLXScraper(self.rate_limiter),
+            'autoplac': AutoplacScraper(self.rate_limiter)
         }
+        self.max_pages_per_browser = max_pages_per_browser
+        # Page parsing runs in worker processes unless parse_workers is 0
+        self.parse_pool = ParsePool(parse_workers) if parse_workers != 0 else None
+        # Fetched pages are kept for --replay when a cache directory is given
+        self.page_cache = PageCache(cache_dir, cache_ttl_days, cache_max_bytes) if cache_dir else None
+        for scraper in self.scrapers.values():
+            scraper.parse_pool = self.parse_pool
+            scraper.page_cache = self.page_cache
+        self.playwright = None
+        self.pool = None
+        self.stores = {}
+        self.saved = {}
+    
+    async def __aenter__(self):
+        # One Playwright driver and one browser pool shared by every scraper run
+        self.playwright = await async_playwright().start()
+        self.pool = BrowserPool(self.playwright, max_pages_per_browser=self.max_pages_per_browser)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        print(f"Browser pool: {self.pool.report()}")
+        print(f"Rate limiter: {self.rate_limiter.report()}")
+        if self.parse_pool:
+            print(f"Parse pool: {self.parse_pool.report()}")
+            self.parse_pool.close()
+        if self.page_cache:
+            dropped, deleted = self.page_cache.evict()
+            print(f"Page cache: {self.page_cache.report()}, evicted {dropped} fetches ({deleted} files)")
+        for platform, scraper in self.scrapers.items():
+            if scraper.page_stats["pages"]:
+                print(f"{platform}: {scraper.report_stats()}")
+            await scraper.close()
+        await self.pool.close()
+        await self.playwright.stop()
     
-    async def run_scraper(self, platform: str, search_url: str, limit_pages: int = 2) -> List[Dict[str, Any]]:
-        """Run a specific scraper"""
+    async def run_scraper(self, platform: str, search_url: str, limit_pages: int = 2, tabs: int = 1,
+                          start_page: int = 0, start_url: Optional[str] = None) -> AsyncIterator[ScrapedPage]:
+        """Run a specific scraper, yielding each result page"""
         if platform not in self.scrapers:
             print(f"Error: Unknown platform '{platform}'")
-            return []
+            return
         
         print(f"\n{'='*60}")
         print(f"Starting {platform.upper()} scraper")
         print(f"URL: {search_url}")
         print(f"Page limit: {limit_pages}")
+        print(f"Tabs: {tabs}")
+        if start_page:
+            print(f"Resuming at page {start_page + 1}")
         print(f"{'='*60}\n")
         
-        async with async_playwright() as playwright:
-            scraper = self.scrapers[platform]
-            results = await scraper.scrape(playwright, search_url, limit_pages)
-            
-        print(f"\n✓ Scraped {len(results)} listings from {platform}")
-        return results
+        scraper = self.scrapers[platform]
+        count = 0
+        async for page in scraper.scrape(self.pool, search_url, limit_pages, tabs, start_page, start_url):
+            count += len(page.listings)
+            yield page
+        
+        print(f"\n✓ Scraped {count} listings from {platform}")
+    
+    async def run_pipeline(self, entries: List[Tuple[str, str, int, int]],
+                           on_batch: Callable[[List[Dict[str, Any]]], None],
+                           max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                           platform_caps: Optional[Dict[str, int]] = None,
+                           queue_size: int = DEFAULT_QUEUE_SIZE,
+                           checkpoint: Optional[CrawlCheckpoint] = None,
+                           incremental: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Runs (platform, search_url, pages, tabs) entries concurrently and hands every
+        result page's listings to ``on_batch`` as it arrives. Returns the listing count.
+
+        Entries are bounded by ``max_concurrency`` and the per-platform caps. Pages pass
+        through a queue of ``queue_size`` batches, so scrapers wait instead of piling up
+        results when saving falls behind. With a ``checkpoint``, each entry starts at its
+        saved cursor and the cursor moves once a page has been handed to ``on_batch``.
+
+        ``incremental`` ({"known_ids", "threshold", "patience"}) crawls results newest
+        first and stops an entry once ``patience`` pages in a row have at least
+        ``threshold`` of their listings in ``known_ids`` - the rest of it was seen before.
+        """
+        queue = asyncio.Queue(maxsize=max(1, queue_size))
+        global_limit = asyncio.Semaphore(max(1, max_concurrency))
+        platform_caps = platform_caps or {}
+        platform_limits = {
+            platform: asyncio.Semaphore(max(1, platform_caps.get(platform, DEFAULT_PLATFORM_CONCURRENCY)))
+            for platform in {entry[0] for entry in entries}
+        }
+        
+        seen = {}
+        if checkpoint:
+            checkpoint.begin([(platform, search_url) for platform, search_url, _, _ in entries])
+            seen = {
+                CrawlCheckpoint.key(platform, search_url): set(checkpoint.seen_ids(platform, search_url))
+                for platform, search_url, _, _ in entries
+            }
+        
+        async def produce(platform: str, search_url: str, pages: int, entry_tabs: int):
+            start_page, start_url, done = checkpoint.start(platform, search_url) if checkpoint else (0, None, False)
+            if done:
+                print(f"Skipping {platform} {search_url}: finished before the interruption")
+                return
+            # Take the platform slot first so a queued entry never holds a global slot idle
+            async with platform_limits[platform], global_limit:
+                # An entry is done once its pages run out, even if some failed after their
+                # retries; only an interrupted crawl is resumed
+                completed = True
+                fetch_url = search_url
+                if incremental and platform in self.scrapers:
+                    # The checkpoint keeps the configured URL as its key
+                    fetch_url = self.scrapers[platform].newest_first_url(search_url)
+                known_pages = 0
+                try:
+                    pages_iter = self.run_scraper(platform, fetch_url, pages, entry_tabs, start_page, start_url)
+                    async with contextlib.aclosing(pages_iter):
+                        async for page in pages_iter:
+                            await queue.put((platform, search_url, page))
+                            if incremental and page.listings:
+                                known = sum(listing['source_id'] in incremental['known_ids'] for listing in page.listings)
+                                known_pages = known_pages + 1 if known >= incremental['threshold'] * len(page.listings) else 0
+                                if known_pages >= incremental['patience']:
+                                    print(f"Stopping {platform} {search_url} at page {page.page_num + 1}: "
+                                          f"{known}/{len(page.listings)} listings already known")
+                                    break
+                except Exception as e:
+                    print(f"Error scraping {platform}: {e}")
+                    completed = False
+                # Queued behind the entry's pages, so it is only marked done once they are saved
+                if completed:
+                    await queue.put((platform, search_url, None))
+        
+        async def finish(producers):
+            await asyncio.gather(*producers)
+            await queue.put(None)
+        
+        producers = [asyncio.create_task(produce(*entry)) for entry in entries]
+        finisher = asyncio.create_task(finish(producers))
+        total = 0
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                platform, search_url, page = item
+                if page is None:
+                    if checkpoint:
+                        checkpoint.finish(platform, search_url)
+                    continue
+                if page.error:
+                    # The cursor stays on the failed page
+                    continue
+                
+                listings = page.listings
+                entry_seen = seen.get(CrawlCheckpoint.key(platform, search_url))
+                if entry_seen:
+                    listings = [listing for listing in listings if listing['source_id'] not in entry_seen]
+                if listings:
+                    on_batch(listings)
+                    total += len(listings)
+                if checkpoint:
+                    checkpoint.record_page(platform, search_url, page.page_num, page.next_url,
+                                           [listing['source_id'] for listing in listings])
+        finally:
+            for task in producers + [finisher]:
+                task.cancel()
+        return total
     
-    async def run_all_from_config(self, config_path: str, limit_pages: int = 2) -> List[Dict[str, Any]]:
-        """Run all scrapers from a configuration file"""
+    async def run_all_from_config(self, config_path: str, limit_pages: int = 2, tabs: int = 1,
+                                  on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                                  checkpoint: Optional[CrawlCheckpoint] = None,
+                                  incremental: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Run all scrapers from a configuration file concurrently.
+
+        Entries run in parallel, bounded by the global ``max_concurrency`` and the
+        per-platform ``platform_concurrency`` caps from the config. ``on_batch``
+        is called with each result page's listings as soon as the page is parsed.
+        Returns the number of listings scraped.
+        """
         config_file = Path(config_path)
         if not config_file.exists():
             print(f"Error: Config file not found: {config_path}")
-            return []
+            return 0
         
         with open(config_file, 'r', encoding='utf-8') as f:
             config = json.load(f)
         
-        all_results = []
+        self.rate_limiter.configure(config.get('rate_limit', {}))
+        self.configure_platforms(config)
         
+        entries = []
         for scraper_config in config.get('scrapers', []):
             platform = scraper_config.get('platform')
             search_url = scraper_config.get('search_url')
             pages = scraper_config.get('pages', limit_pages)
+            entry_tabs = scraper_config.get('tabs', tabs)
             
             if not platform or not search_url:
                 print(f"Warning: Skipping invalid config entry: {scraper_config}")
                 continue
             
-            try:
-                results = await self.run_scraper(platform, search_url, pages)
-                all_results.extend(results)
-            except Exception as e:
-                print(f"Error scraping {platform}: {e}")
-                continue
+            entries.append((platform, search_url, pages, entry_tabs))
         
-        return all_results
+        return await self.run_pipeline(
+            entries, on_batch or (lambda listings: None),
+            max_concurrency=config.get('max_concurrency', DEFAULT_MAX_CONCURRENCY),
+            platform_caps=config.get('platform_concurrency', {}),
+            queue_size=config.get('queue_size', DEFAULT_QUEUE_SIZE),
+            checkpoint=checkpoint,
+            incremental=incremental,
+        )
+    
+    def configure_platforms(self, config: Dict[str, Any]):
+        for platform, settings in config.get('platforms', {}).items():
+            if platform in self.scrapers:
+                self.scrapers[platform].configure(settings)
     
-    def save_results(self, results: List[Dict[str, Any]], output_path: str):
-        """Save results to JSON file"""
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+    async def replay(self, platform: Optional[str] = None, since: Optional[str] = None,
+                     until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Re-parses cached pages with the current parsers, without network or browser.
+        A listing seen on several cached pages keeps its most recent version, stamped
+        with that page's fetch time rather than the time of the replay.
+        """
+        if not self.page_cache:
+            print("Error: replay needs a page cache (--cache-dir)")
+            return []
         
-        # Load existing data if it exists
-        existing_data = []
-        if output_file.exists():
-            try:
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-            except:
-                existing_data = []
+        started = time.monotonic()
+        latest = {}
+        counts = {}
+        # Bounded so months of pages don't sit in memory waiting for a parse worker
+        in_flight = asyncio.Semaphore(max(2, 2 * (self.parse_pool.max_workers if self.parse_pool else 1)))
         
-        # Merge new results with existing, avoiding duplicates
-        existing_ids = {item.get('source_id') for item in existing_data if item.get('source_id')}
-        new_results = [r for r in results if r.get('source_id') not in existing_ids]
+        async def parse(entry: Dict[str, Any], content: str):
+            try:
+                listings, _ = await self.scrapers[entry['platform']].parse(content, entry['url'])
+                return entry, listings
+            finally:
+                in_flight.release()
         
-        # Add scraped_at timestamp to new results
-        timestamp = datetime.now().isoformat()
-        for result in new_results:
-            result['scraped_at'] = timestamp
+        tasks = []
+        for entry, content in self.page_cache.iter_pages(platform, since, until):
+            if entry['platform'] not in self.scrapers:
+                continue
+            await in_flight.acquire()
+            tasks.append(asyncio.create_task(parse(entry, content)))
         
-        # Combine and save
-        all_data = existing_data + new_results
+        # Fetch order is kept, so later pages overwrite earlier versions of a listing
+        for task in tasks:
+            try:
+                entry, listings = await task
+            except Exception as e:
+                print(f"Error re-parsing a cached page: {e}")
+                continue
+            page_counts = counts.setdefault(entry['platform'], [0, 0])
+            page_counts[0] += 1
+            page_counts[1] += len(listings)
+            for listing in listings:
+                listing['scraped_at'] = entry['fetched_at']
+                latest[listing['source_id']] = listing
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_data, f, ensure_ascii=False, indent=2)
+        elapsed = time.monotonic() - started
+        for name, (pages, listings) in sorted(counts.items()):
+            print(f"✓ Replayed {pages} cached {name} pages: {listings} listings")
+        print(f"✓ Replay took {elapsed:.1f}s, {len(latest)} distinct listings")
+        return list(latest.values())
+    
+    def get_store(self, store_path: str) -> SegmentStore:
+        # The legacy single-file listings.json next to the store is imported on first use
+        if store_path not in self.stores:
+            legacy_path = Path(store_path).parent / 'listings.json'
+            self.stores[store_path] = SegmentStore(store_path, legacy_path=str(legacy_path))
+        return self.stores[store_path]
+    
+    def save_results(self, results: List[Dict[str, Any]], store_path: str):
+        """
+        Append results to the segment store.
+        Only new listings and price/mileage/status changes are written, dated by each
+        result's scraped_at when it has one (replayed pages) and by now otherwise.
+        """
+        store = self.get_store(store_path)
+        new_count, change_count = store.append(results)
         
         print(f"\n{'='*60}")
-        print(f"✓ Saved {len(new_results)} new listings to {output_path}")
-        print(f"  Total listings in database: {len(all_data)}")
+        print(f"✓ Saved {new_count} new listings to {store_path}")
+        print(f"  Price/mileage changes recorded: {change_count}")
+        print(f"  Total listings in database: {store.load_manifest()['total']}")
+        print(f"{'='*60}\n")
+    
+    def save_batch(self, listings: List[Dict[str, Any]], store_path: str):
+        """
+        Appends one result page's listings to the store as soon as it is scraped.
+        """
+        new_count, change_count = self.get_store(store_path).append(listings)
+        saved = self.saved.setdefault(store_path, [0, 0])
+        saved[0] += new_count
+        saved[1] += change_count
+    
+    def print_saved(self, store_path: str):
+        new_count, change_count = self.saved.get(store_path, (0, 0))
+        print(f"\n{'='*60}")
+        print(f"✓ Saved {new_count} new listings to {store_path}")
+        print(f"  Price/mileage changes recorded: {change_count}")
+        print(f"  Total listings in database: {self.get_store(store_path).load_manifest()['total']}")
+        print(f"  Cross-platform duplicates: {self.get_store(store_path).load_duplicates().report()}")
         print(f"{'='*60}\n")
 
 
-async def main():
-    parser = argparse.ArgumentParser(description='Car Scraper CLI')
-    parser.add_argument('--platform', choices=['otomoto', 'olx', 'autoplac'], 
-                        help='Platform to scrape')
-    parser.add_argument('--url', help='Search URL to scrape')
-    parser.add_argument('--config', help='Path to config JSON file')
-    parser.add_argument('--output', default='frontend/public/data/listings.json',
-                        help='Output JSON file path')
-    parser.add_argument('--pages', type=int, default=2,
-                        help='Number of pages to scrape per platform')
-    parser.add_argument('--test', action='store_true',
-                        help='Run test scrape with sample URLs')
+async def run(cli: ScraperCLI, args):
+    # Every result page is saved as soon as it is parsed, so a crash only loses the page in flight
+    def save(listings):
+        cli.save_batch(listings, args.store)
     
-    args = parser.parse_args()
+    # The checkpoint lives next to the data it describes, so both are committed together
+    checkpoint = CrawlCheckpoint(args.checkpoint or str(Path(args.store) / 'crawl_state.json'), args.run_id)
+    if args.resume:
+        if checkpoint.load():
+            print(f"Resuming the interrupted crawl from {checkpoint.path}")
+        else:
+            print("No interrupted crawl to resume, starting from the first page")
     
-    cli = ScraperCLI()
-    results = []
+    incremental = None
+    if args.incremental:
+        # Snapshot of the store's IDs: listings saved during this run must not count as known
+        known_ids = set(cli.get_store(args.store).load_index())
+        incremental = {'known_ids': known_ids, 'threshold': args.stop_threshold, 'patience': args.stop_patience}
+        print(f"Incremental crawl: {len(known_ids)} known listings, stopping at "
+              f"{args.stop_threshold:.0%} known for {args.stop_patience} page(s)")
     
     if args.test:
         # Test mode with sample URLs
@@ -136,31 +385,118 @@ async def main():
             'otomoto': 'https://www.otomoto.pl/osobowe',
             'olx': 'https://www.olx.pl/motoryzacja/samochody/',
         }
-        
-        for platform, url in test_urls.items():
-            try:
-                platform_results = await cli.run_scraper(platform, url, limit_pages=1)
-                results.extend(platform_results)
-            except Exception as e:
-                print(f"Test failed for {platform}: {e}")
+        total = await cli.run_pipeline([(platform, url, 1, 1) for platform, url in test_urls.items()], save,
+                                       checkpoint=checkpoint, incremental=incremental)
     
     elif args.config:
         # Run from config file
-        results = await cli.run_all_from_config(args.config, args.pages)
+        total = await cli.run_all_from_config(args.config, args.pages, args.tabs, on_batch=save,
+                                              checkpoint=checkpoint, incremental=incremental)
     
-    elif args.platform and args.url:
+    else:
         # Run single scraper
-        results = await cli.run_scraper(args.platform, args.url, args.pages)
+        total = await cli.run_pipeline([(args.platform, args.url, args.pages, args.tabs)], save,
+                                       checkpoint=checkpoint, incremental=incremental)
     
+    if total:
+        cli.print_saved(args.store)
     else:
+        print("No results to save.")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Car Scraper CLI')
+    parser.add_argument('command', nargs='?', choices=['scrape', 'compact', 'export'], default='scrape',
+                        help='scrape (default), compact the store\'s segments, or export static data for the frontend')
+    parser.add_argument('--platform', choices=['otomoto', 'olx', 'autoplac'], 
+                        help='Platform to scrape')
+    parser.add_argument('--url', help='Search URL to scrape')
+    parser.add_argument('--config', help='Path to config JSON file')
+    parser.add_argument('--store', default='frontend/public/data/store',
+                        help='Listing store directory (segments + manifest)')
+    parser.add_argument('--export-dir',
+                        help='Output directory of the export (default: frontend/public/data/export, '
+                             'or data/parquet with --format parquet)')
+    parser.add_argument('--format', choices=['json', 'parquet'], default='json',
+                        help='export: the frontend\'s static JSON, or typed Parquet files for analysis (needs pyarrow)')
+    parser.add_argument('--pages', type=int, default=2,
+                        help='Number of pages to scrape per platform')
+    parser.add_argument('--tabs', type=int, default=1,
+                        help='Result pages to fetch in parallel tabs (otomoto, olx)')
+    parser.add_argument('--test', action='store_true',
+                        help='Run test scrape with sample URLs')
+    parser.add_argument('--recycle-after', type=int, default=50,
+                        help='Relaunch a pooled browser after it has served this many pages')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help='Processes parsing result pages (default: one per CPU, 0 parses on the event loop)')
+    parser.add_argument('--cache-dir',
+                        help='Keep fetched pages in this directory, and read them from it with --replay')
+    parser.add_argument('--cache-ttl-days', type=int, default=DEFAULT_TTL_DAYS,
+                        help='Drop cached pages older than this many days')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Drop the oldest cached pages beyond this size')
+    parser.add_argument('--replay', action='store_true',
+                        help='Re-parse the pages in --cache-dir instead of scraping (no network, no browser)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted crawl from its checkpoint (starts fresh when there is none)')
+    parser.add_argument('--checkpoint',
+                        help='Crawl checkpoint file (default: crawl_state.json in the store directory)')
+    parser.add_argument('--run-id',
+                        help='With --resume: only resume a checkpoint written under this run ID (e.g. the CI run)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Sort results newest first and stop each entry once its pages are mostly already stored')
+    parser.add_argument('--stop-threshold', type=float, default=DEFAULT_STOP_THRESHOLD,
+                        help='With --incremental: share of known listings that counts a page as seen (default: 0.8)')
+    parser.add_argument('--stop-patience', type=int, default=DEFAULT_STOP_PATIENCE,
+                        help='With --incremental: seen pages in a row before an entry stops (default: 1)')
+    parser.add_argument('--since', help='With --replay: only pages fetched on or after this ISO date')
+    parser.add_argument('--until', help='With --replay: only pages fetched before this ISO date')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'compact':
+        ScraperCLI().get_store(args.store).compact()
+        return
+    
+    if args.command == 'export':
+        listings = ScraperCLI().get_store(args.store).iter_listings()
+        if args.format == 'parquet':
+            export_parquet(listings, args.export_dir or 'data/parquet')
+        else:
+            export_static(listings, args.export_dir or 'frontend/public/data/export')
+        return
+    
+    cache_options = {
+        'cache_dir': args.cache_dir,
+        'cache_ttl_days': args.cache_ttl_days,
+        'cache_max_bytes': args.cache_max_mb * 1024 * 1024,
+    }
+    
+    if args.replay:
+        if not args.cache_dir:
+            parser.error('--replay needs --cache-dir')
+        cli = ScraperCLI(parse_workers=args.parse_workers, **cache_options)
+        if args.config:
+            with open(args.config, 'r', encoding='utf-8') as f:
+                cli.configure_platforms(json.load(f))
+        try:
+            results = await cli.replay(args.platform, args.since, args.until)
+        finally:
+            if cli.parse_pool:
+                cli.parse_pool.close()
+        if results:
+            cli.save_results(results, args.store)
+        else:
+            print("No results to save.")
+        return
+    
+    if not (args.test or args.config or (args.platform and args.url)):
         parser.print_help()
         sys.exit(1)
     
-    # Save results
-    if results:
-        cli.save_results(results, args.output)
-    else:
-        print("No results to save.")
+    async with ScraperCLI(max_pages_per_browser=args.recycle_after, parse_workers=args.parse_workers,
+                          **cache_options) as cli:
+        await run(cli, args)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,276 @@
+"""
+Columnar export for analysis: the listings as typed Parquet files partitioned by platform
+and month, and price statistics computed from them memory-mapped with Arrow's vectorized
+kernels instead of parsing JSON row by row.
+
+Layout of a Parquet export directory (hive-style, so pandas, DuckDB and pyarrow.dataset
+read the partition columns back from the paths):
+    platform=<platform>/month=<YYYY-MM>/listings.parquet
+
+Needs the optional pyarrow package (pip install pyarrow). Quick statistics from a shell:
+    python columnar.py ../data/parquet --by brand --platform otomoto
+"""
+
+import argparse
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    from pyarrow import fs
+except ImportError:
+    pa = None
+
+# Listing column -> Arrow type name; repeated strings are dictionary-encoded. The platform
+# is the partition path, read back as a dictionary column too.
+COLUMNS = {
+    'source_id': 'string',
+    'source_url': 'string',
+    'brand': 'dictionary',
+    'model': 'dictionary',
+    'generation': 'dictionary',
+    'production_year': 'int32',
+    'fuel_type': 'dictionary',
+    'power': 'int32',
+    'engine_capacity': 'float32',
+    'price': 'float32',
+    'currency': 'dictionary',
+    'mileage': 'int32',
+    'body_type': 'dictionary',
+    'color': 'dictionary',
+    'condition': 'dictionary',
+    'location': 'string',
+    'status': 'dictionary',
+    'created_at_source': 'string',
+    'scraped_at': 'timestamp',
+    'cluster_id': 'string',
+}
+
+# Listings buffered per partition before they are written out as one row group
+ROW_GROUP_SIZE = 100_000
+
+FILE_NAME = 'listings.parquet'
+
+# Dimension name (also the key in the output rows) -> grouped column, like stats.DIMENSIONS
+DIMENSIONS = {
+    'year': 'production_year',
+    'brand': 'brand',
+    'model': 'model',
+    'date': 'scraped_at',
+    'month': 'month',
+    'platform': 'platform',
+    'fuel': 'fuel_type',
+}
+
+# Output name -> percentile
+PERCENTILES = {'p25Price': 25, 'medianPrice': 50, 'p75Price': 75, 'p90Price': 90}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError('Parquet export needs the pyarrow package (pip install pyarrow)')
+
+
+def listing_schema() -> "pa.Schema":
+    _require_pyarrow()
+    types = {
+        'string': pa.string(),
+        'dictionary': pa.dictionary(pa.int32(), pa.string()),
+        'int32': pa.int32(),
+        'float32': pa.float32(),
+        'timestamp': pa.timestamp('us'),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in COLUMNS.items()])
+
+
+def _coerce(value: Any, kind: str) -> Any:
+    # Legacy records hold the odd "150 KM" or 2011.0; anything unparseable becomes null
+    if value is None or value == '':
+        return None
+    try:
+        if kind == 'int32':
+            return int(float(value))
+        if kind == 'float32':
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+
+def _column(values: List[Any], kind: str, type_: "pa.DataType") -> "pa.Array":
+    try:
+        if kind == 'timestamp':
+            return pa.array(values, pa.string()).cast(type_)
+        return pa.array(values, type_)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        if kind == 'timestamp':
+            return pa.array([_coerce(value, 'string') for value in values], pa.string()).cast(type_, safe=False)
+        return pa.array([_coerce(value, kind) for value in values], type_)
+
+
+def _record_batch(rows: List[Dict[str, Any]], schema: "pa.Schema") -> "pa.RecordBatch":
+    return pa.RecordBatch.from_arrays(
+        [_column([row.get(name) for row in rows], COLUMNS[name], schema.field(name).type) for name in COLUMNS],
+        schema=schema,
+    )
+
+
+def export_parquet(listings: Iterable[Dict[str, Any]], export_dir: str,
+                   row_group_size: int = ROW_GROUP_SIZE) -> Dict[Tuple[str, str], int]:
+    """
+    Writes `listings` into one Parquet file per platform and month under `export_dir`,
+    streaming: at most `row_group_size` listings per partition are held in memory.
+    Partitions no longer present are removed. Returns the row count per partition.
+    """
+    schema = listing_schema()
+    root = Path(export_dir)
+    buffers: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+    writers: Dict[Tuple[str, str], "pq.ParquetWriter"] = {}
+    counts: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def partition_path(key: Tuple[str, str]) -> Path:
+        platform, month = key
+        return root / f"platform={platform}" / f"month={month}" / FILE_NAME
+
+    def flush(key: Tuple[str, str]):
+        rows = buffers.pop(key)
+        writer = writers.get(key)
+        if writer is None:
+            path = partition_path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = writers[key] = pq.ParquetWriter(str(path) + '.tmp', schema, compression='zstd')
+        writer.write_batch(_record_batch(rows, schema), row_group_size=len(rows))
+        counts[key] += len(rows)
+
+    try:
+        for listing in listings:
+            key = (listing.get('platform') or 'unknown', (listing.get('scraped_at') or '')[:7] or 'unknown')
+            buffers[key].append(listing)
+            if len(buffers[key]) >= row_group_size:
+                flush(key)
+        for key in list(buffers):
+            flush(key)
+    except BaseException:
+        for key, writer in writers.items():
+            writer.close()
+            os.remove(str(partition_path(key)) + '.tmp')
+        raise
+
+    for key, writer in writers.items():
+        writer.close()
+        os.replace(str(partition_path(key)) + '.tmp', partition_path(key))
+    written = {partition_path(key) for key in writers}
+    for path in root.glob(f"platform=*/month=*/{FILE_NAME}"):
+        if path not in written:
+            path.unlink()
+
+    print(f"✓ Exported {sum(counts.values())} listings in {len(counts)} Parquet partitions to {export_dir}")
+    return dict(counts)
+
+
+def open_dataset(export_dir: str) -> "ds.Dataset":
+    """
+    The export as one dataset, its files memory-mapped rather than read into buffers.
+    """
+    _require_pyarrow()
+    return ds.dataset(
+        str(Path(export_dir).resolve()),
+        format='parquet',
+        partitioning=ds.HivePartitioning.discover(infer_dictionary=True),
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def price_stats(export_dir: str, dimension: str, dedupe: bool = True, platform: Optional[str] = None,
+                brand: Optional[str] = None, model: Optional[str] = None, fuel_type: Optional[str] = None,
+                min_year: Optional[int] = None, max_year: Optional[int] = None,
+                min_price: Optional[float] = None, max_price: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    The rows of stats.price_stats (count, total, avgPrice, minPrice, maxPrice and
+    nearest-rank percentiles per value of `dimension`) over a Parquet export.
+
+    Only the grouped column and the price are read; the platform filter skips other
+    platforms' files entirely and the other filters run as Arrow expressions in the scan.
+    """
+    dataset = open_dataset(export_dir)
+    column = DIMENSIONS[dimension]
+    key = ds.field(column).cast(pa.date32()) if dimension == 'date' else ds.field(column)
+
+    condition = ds.field('price').is_valid() & (ds.field('price') > 0) & key.is_valid()
+    for field, value in (('platform', platform), ('brand', brand), ('model', model), ('fuel_type', fuel_type)):
+        if value is not None:
+            condition &= ds.field(field) == value
+    for field, low, high in (('production_year', min_year, max_year), ('price', min_price, max_price)):
+        if low is not None:
+            condition &= ds.field(field) >= low
+        if high is not None:
+            condition &= ds.field(field) <= high
+    if dedupe:
+        condition &= ds.field('cluster_id').is_null() | (ds.field('cluster_id') == ds.field('source_id'))
+
+    table = dataset.to_table(columns={'key': key, 'price': ds.field('price').cast(pa.float64())}, filter=condition)
+    if pa.types.is_dictionary(table.schema.field('key').type):
+        table = table.set_column(0, 'key', pc.cast(table.column('key'), table.schema.field('key').type.value_type))
+    if not table.num_rows:
+        return []
+
+    # Sorted by key then price, each group is a contiguous run of ascending prices, so
+    # every percentile is one take() at (group start + nearest rank - 1)
+    table = table.sort_by([('key', 'ascending'), ('price', 'ascending')])
+    groups = table.group_by('key', use_threads=False).aggregate(
+        [('price', 'count'), ('price', 'sum'), ('price', 'min'), ('price', 'max')]
+    ).to_pydict()
+    starts, start = [], 0
+    for size in groups['price_count']:
+        starts.append(start)
+        start += size
+    prices = table.column('price')
+    percentiles = {
+        name: pc.take(prices, [first + (size * p + 99) // 100 - 1
+                               for first, size in zip(starts, groups['price_count'])]).to_pylist()
+        for name, p in PERCENTILES.items()
+    }
+
+    rows = []
+    for i, value in enumerate(groups['key']):
+        count, total = groups['price_count'][i], groups['price_sum'][i]
+        rows.append({
+            dimension: value.isoformat() if dimension == 'date' else value,
+            'count': count,
+            'total': total,
+            'avgPrice': round(total / count),
+            'minPrice': groups['price_min'][i],
+            'maxPrice': groups['price_max'][i],
+            **{name: values[i] for name, values in percentiles.items()},
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Price statistics from a Parquet export')
+    parser.add_argument('export_dir', help='Directory written by `cli.py export --format parquet`')
+    parser.add_argument('--by', choices=list(DIMENSIONS), default='brand', help='Grouping dimension')
+    parser.add_argument('--platform')
+    parser.add_argument('--brand')
+    parser.add_argument('--model')
+    parser.add_argument('--fuel-type')
+    parser.add_argument('--min-year', type=int)
+    parser.add_argument('--max-year', type=int)
+    parser.add_argument('--all', action='store_true', help='Count cross-platform duplicates separately')
+    args = parser.parse_args()
+
+    rows = price_stats(args.export_dir, args.by, dedupe=not args.all, platform=args.platform, brand=args.brand,
+                       model=args.model, fuel_type=args.fuel_type, min_year=args.min_year, max_year=args.max_year)
+    print(f"{args.by:>20s} {'count':>8s} {'avg':>9s} {'p25':>9s} {'median':>9s} {'p75':>9s} {'p90':>9s}")
+    for row in rows:
+        print(f"{str(row[args.by]):>20s} {row['count']:8d} {row['avgPrice']:9.0f} {row['p25Price']:9.0f} "
+              f"{row['medianPrice']:9.0f} {row['p75Price']:9.0f} {row['p90Price']:9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,122 @@
-from sqlalchemy import create_engine
+import os
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import MetaData, create_engine, event, inspect
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./car_listings.db"
+# Any SQLAlchemy URL; PostgreSQL (postgresql+psycopg://...) gets a regular connection pool
+SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./car_listings.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# PRAGMAs applied to every SQLite connection, per SQLITE_PROFILE. With WAL, readers see the
+# last commit while a scrape is writing instead of waiting for it; synchronous=NORMAL only
+# fsyncs at checkpoints, so a power cut can lose the last transactions but never corrupts.
+SQLITE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # KiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # WAL, fsync on every commit
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+    # Rollback journal and SQLite's defaults, for filesystems without shared memory (NFS);
+    # readers and the writer block each other
+    "rollback": {},
+}
+SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "wal")
+
+# Connections of the read engine (SQLite) or of the one engine (other databases)
+READ_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 8))
+MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 4))
+# Seconds a request waits for a free connection, or an ingest batch for the writer
+POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+
+
+def _apply_pragmas(engine: Engine, pragmas: Dict[str, Any], read_only: bool):
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        # The driver's implicit BEGIN is replaced by the "begin" hook below
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            # journal_mode is stored in the file; the writer sets it once for everyone
+            if not (read_only and name == "journal_mode"):
+                cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def on_begin(connection):
+        # The writer takes the write lock up front, so a transaction never fails halfway
+        # on upgrading a read lock; readers only need a snapshot
+        connection.exec_driver_sql("BEGIN" if read_only else "BEGIN IMMEDIATE")
+
+
+def create_engines(url: str = SQLALCHEMY_DATABASE_URL, profile: str = SQLITE_PROFILE) -> Tuple[Engine, Engine]:
+    """
+    (writer, reader) engines for `url`.
+
+    A SQLite file gets a single-connection writer engine, so ingests are serialized in
+    the pool instead of racing for the file lock, and a pooled read-only engine for the
+    API. Other databases handle concurrent writers themselves and share one pooled engine.
+    """
+    if make_url(url).get_backend_name() != "sqlite":
+        engine = create_engine(url, pool_size=READ_POOL_SIZE, max_overflow=MAX_OVERFLOW,
+                               pool_timeout=POOL_TIMEOUT, pool_pre_ping=True, pool_recycle=1800)
+        return engine, engine
+
+    pragmas = SQLITE_PROFILES[profile]
+    connect_args = {"check_same_thread": False}
+    if make_url(url).database in (None, "", ":memory:"):
+        # One in-memory database per connection: nothing to pool or split
+        engine = create_engine(url, connect_args=connect_args)
+        _apply_pragmas(engine, pragmas, read_only=False)
+        return engine, engine
+
+    writer = create_engine(url, connect_args=connect_args, pool_size=1, max_overflow=0, pool_timeout=POOL_TIMEOUT)
+    _apply_pragmas(writer, pragmas, read_only=False)
+    reader = create_engine(url, connect_args=connect_args, pool_size=READ_POOL_SIZE, max_overflow=MAX_OVERFLOW,
+                           pool_timeout=POOL_TIMEOUT)
+    _apply_pragmas(reader, pragmas, read_only=True)
+    return writer, reader
+
+
+def upgrade_schema(engine: Engine, metadata: MetaData) -> List[str]:
+    """
+    create_all, plus what it leaves out on tables that already exist: columns added to
+    the models since (all nullable, so ALTER TABLE ADD COLUMN) and new indexes.
+    Returns the added columns as "table.column".
+    """
+    metadata.create_all(bind=engine)
+    added = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    connection.exec_driver_sql(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                    )
+                    added.append(f"{table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+    for name in added:
+        print(f"Added column {name}")
+    return added
+
+
+engine, read_engine = create_engines()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -17,3 +126,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """
+    Sessions for endpoints that only read; on SQLite they never wait for an ingest.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
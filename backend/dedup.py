@@ -0,0 +1,162 @@
+"""
+Cross-platform duplicate detection: the same car listed on otomoto, olx and autoplac.
+
+Listings are blocked on their fingerprint (normalized brand, model and production year).
+Within a block they are kept sorted by mileage, so a new listing is only compared with
+the few neighbours whose mileage is within tolerance - a bisect per lookup instead of a
+comparison against every stored listing. A match also needs a close price, the same city
+(when both have one) and a different platform.
+
+Every listing gets a cluster_id: the source_id of the first listing seen of that car.
+Listings without a duplicate are clusters of their own.
+"""
+
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+# Odometer readings of the same car differ between listings (rounding, days apart)
+MILEAGE_TOLERANCE_KM = 1000
+MILEAGE_TOLERANCE_RATIO = 0.02
+# Prices differ a little between platforms (fees, rounding, "do negocjacji")
+PRICE_TOLERANCE_RATIO = 0.03
+
+# Listing fields the index needs, in the order they are persisted next to a cluster ID
+FINGERPRINT_FIELDS = ('brand', 'model', 'production_year', 'mileage', 'price', 'location', 'platform')
+
+_SEPARATORS_RE = re.compile(r"[\s\-_]+")
+_CITY_SPLIT_RE = re.compile(r"\s*[,(]|\s+-\s+")
+
+
+def _norm(value: Any) -> str:
+    return _SEPARATORS_RE.sub(" ", str(value)).strip().lower() if value else ""
+
+
+def vehicle_fingerprint(listing: Dict[str, Any]) -> Optional[Tuple[str, str, int]]:
+    """
+    Blocking key of a listing: (brand, model, year), or None when any of them is missing.
+    """
+    brand, model, year = _norm(listing.get('brand')), _norm(listing.get('model')), listing.get('production_year')
+    if not brand or not model or not year:
+        return None
+    return brand, model, int(year)
+
+
+def fingerprint_key(listing: Dict[str, Any]) -> Optional[str]:
+    """
+    vehicle_fingerprint as one string, e.g. "bmw|seria 3|2019", or None. Stored in the
+    indexed listings.fingerprint column, so a block is one index lookup in the database.
+    """
+    key = vehicle_fingerprint(listing)
+    return "|".join(map(str, key)) if key else None
+
+
+def city(location: Optional[str]) -> str:
+    """
+    "Warszawa, Mokotów" and "Warszawa - Dziś o 12:30" both become "warszawa".
+    """
+    if not location:
+        return ""
+    return _norm(_CITY_SPLIT_RE.split(location, 1)[0])
+
+
+def index_entry(listing: Dict[str, Any], cluster_id: Optional[str] = None) -> Tuple:
+    """
+    (mileage, price, city, platform, cluster_id): what the index keeps of a listing.
+    """
+    return (listing.get('mileage'), listing.get('price') or 0, city(listing.get('location')),
+            listing.get('platform') or "", cluster_id)
+
+
+def same_car(entry: Tuple, other: Tuple) -> bool:
+    """
+    Match rules for two index entries of the same block.
+    """
+    mileage, price, entry_city, platform, _ = entry
+    other_mileage, other_price, other_city, other_platform, _ = other
+    if not mileage or not other_mileage:
+        return False
+    if abs(mileage - other_mileage) > max(MILEAGE_TOLERANCE_KM, max(mileage, other_mileage) * MILEAGE_TOLERANCE_RATIO):
+        return False
+    if platform == other_platform:
+        # Within one platform, source_id already identifies a listing
+        return False
+    if entry_city and other_city and entry_city != other_city:
+        return False
+    if price and other_price and abs(price - other_price) > PRICE_TOLERANCE_RATIO * max(price, other_price):
+        return False
+    return True
+
+
+class DuplicateIndex:
+    """
+    Blocking index over known listings, assigning cluster IDs to new ones.
+
+    Per block: (mileage, price, city, platform, cluster_id) tuples sorted by mileage.
+    """
+
+    def __init__(self):
+        self.blocks: Dict[Tuple[str, str, int], List[Tuple]] = defaultdict(list)
+        self.clusters: Dict[str, str] = {}
+        self.stats = {"listings": 0, "duplicates": 0, "comparisons": 0}
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+    def add(self, listing: Dict[str, Any], cluster_id: Optional[str] = None) -> str:
+        """
+        Indexes `listing` and returns its cluster ID. A known `cluster_id` (a listing
+        loaded back from storage) is kept as is instead of being matched again.
+        """
+        source_id = listing['source_id']
+        if source_id in self.clusters:
+            return self.clusters[source_id]
+
+        key = vehicle_fingerprint(listing)
+        entry = index_entry(listing, cluster_id)
+        if cluster_id is None:
+            match = self.find(key, entry) if key and entry[0] else None
+            cluster_id = match or source_id
+            if match:
+                self.stats["duplicates"] += 1
+            entry = entry[:-1] + (cluster_id,)
+
+        self.clusters[source_id] = cluster_id
+        self.stats["listings"] += 1
+        if key and entry[0]:
+            insort(self.blocks[key], entry)
+        return cluster_id
+
+    def find(self, key: Tuple[str, str, int], entry: Tuple) -> Optional[str]:
+        """
+        Cluster ID of the first indexed listing in block `key` matching `entry`, if any.
+        """
+        block = self.blocks.get(key)
+        if not block:
+            return None
+        # Mileage bounds only; same_car applies the full tolerance against each neighbour
+        mileage = entry[0]
+        tolerance = max(MILEAGE_TOLERANCE_KM, mileage * MILEAGE_TOLERANCE_RATIO) / (1 - MILEAGE_TOLERANCE_RATIO)
+        for other in block[bisect_left(block, (mileage - tolerance,)):]:
+            if other[0] > mileage + tolerance:
+                break
+            self.stats["comparisons"] += 1
+            if same_car(entry, other):
+                return other[-1]
+        return None
+
+    def assign(self, listings: Iterable[Dict[str, Any]]) -> int:
+        """
+        Sets `cluster_id` on every listing that has none. Returns how many were duplicates.
+        """
+        before = self.stats["duplicates"]
+        for listing in listings:
+            if listing.get('source_id'):
+                listing['cluster_id'] = self.add(listing, listing.get('cluster_id'))
+        return self.stats["duplicates"] - before
+
+    def report(self) -> str:
+        listings = self.stats["listings"]
+        return (f"listings={listings}, clusters={len(set(self.clusters.values()))}, "
+                f"duplicates={self.stats['duplicates']}, comparisons={self.stats['comparisons']}")
@@ -0,0 +1,160 @@
+"""
+Static export for the frontend: listings sharded by platform and month, precompressed,
+plus small pre-aggregated summary files for the charts.
+
+Layout of an export directory:
+    version.json                            content hash of the export, polled by the frontend
+    index.json                              shard list and summary file names
+    shards/<platform>/<YYYY-MM>.json.gz     listings of one platform first seen that month
+    summary/<name>.json                     chart series, see SUMMARIES
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import random
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterable
+
+# Summary file name -> (listing field grouped on, key name in the output rows)
+SUMMARIES = {
+    'price_by_year': ('production_year', 'year'),
+    'price_by_date': ('scraped_date', 'date'),
+    'price_by_brand': ('brand', 'brand'),
+    'price_by_fuel': ('fuel_type', 'fuel'),
+}
+
+# Points kept for the price vs mileage scatter chart
+SCATTER_SAMPLE_SIZE = 2000
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    # Unchanged shards keep their bytes, so git only sees the shards that moved
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class SummaryBuilder:
+    """
+    Aggregates listings into the chart series in a single pass.
+    """
+
+    def __init__(self):
+        self.groups = {name: defaultdict(lambda: [0.0, 0]) for name in SUMMARIES}
+        self.scatter: List[Dict[str, Any]] = []
+        self.seen = 0
+        self.clusters = set()
+        self._random = random.Random(0)
+
+    def add(self, listing: Dict[str, Any]):
+        price = listing.get('price')
+        if not price:
+            return
+        # A car listed on several platforms counts once, at the price it was first seen
+        cluster_id = listing.get('cluster_id') or listing.get('source_id')
+        if cluster_id:
+            if cluster_id in self.clusters:
+                return
+            self.clusters.add(cluster_id)
+
+        for name, (field, _) in SUMMARIES.items():
+            value = listing.get(field)
+            if value:
+                group = self.groups[name][value]
+                group[0] += price
+                group[1] += 1
+
+        # Reservoir sample of points with a mileage
+        if listing.get('mileage'):
+            self.seen += 1
+            point = {'mileage': listing['mileage'], 'price': price}
+            if len(self.scatter) < SCATTER_SAMPLE_SIZE:
+                self.scatter.append(point)
+            else:
+                slot = self._random.randrange(self.seen)
+                if slot < SCATTER_SAMPLE_SIZE:
+                    self.scatter[slot] = point
+
+    def build(self) -> Dict[str, List[Dict[str, Any]]]:
+        summaries = {}
+        for name, (_, key) in SUMMARIES.items():
+            rows = [
+                {key: value, 'total': total, 'count': count, 'avgPrice': round(total / count)}
+                for value, (total, count) in self.groups[name].items()
+            ]
+            summaries[name] = sorted(rows, key=lambda row: row[key])
+        summaries['price_vs_mileage'] = self.scatter
+        return summaries
+
+
+def export_static(listings: Iterable[Dict[str, Any]], export_dir: str) -> Dict[str, Any]:
+    """
+    Writes shards, summaries and index.json for `listings` into `export_dir`.
+    Returns the index.
+    """
+    root = Path(export_dir)
+    summary = SummaryBuilder()
+
+    shards = defaultdict(list)
+    for listing in listings:
+        scraped_at = listing.get('scraped_at') or ''
+        listing['scraped_date'] = scraped_at[:10] or None
+        summary.add(listing)
+        del listing['scraped_date']
+        shards[(listing.get('platform') or 'unknown', scraped_at[:7] or 'unknown')].append(listing)
+
+    index = {'total': 0, 'vehicles': 0, 'shards': [], 'summaries': []}
+    content_hash = hashlib.sha256()
+    written = 0
+    for (platform, month), rows in sorted(shards.items()):
+        raw = _dumps(rows)
+        content_hash.update(f"{platform}/{month}".encode('utf-8'))
+        content_hash.update(raw)
+        name = f"shards/{platform}/{month}.json"
+        # mtime=0 keeps the gzip bytes identical across runs for identical data
+        written += _write_if_changed(root / f"{name}.gz", gzip.compress(raw, compresslevel=9, mtime=0))
+        index['shards'].append({
+            'platform': platform,
+            'month': month,
+            'path': f"{name}.gz",
+            'count': len(rows),
+            'bytes': len(raw),
+        })
+        index['total'] += len(rows)
+
+    # Distinct cars behind the priced listings, after cross-platform duplicates
+    index['vehicles'] = len(summary.clusters)
+    for name, rows in summary.build().items():
+        raw = _dumps(rows)
+        content_hash.update(name.encode('utf-8'))
+        content_hash.update(raw)
+        written += _write_if_changed(root / 'summary' / f"{name}.json", raw)
+        index['summaries'].append(name)
+
+    # The timestamp only moves when the content does, so an unchanged export is a no-op
+    version = {'hash': content_hash.hexdigest()[:16], 'generated_at': datetime.now().isoformat(), 'total': index['total']}
+    version_path = root / 'version.json'
+    if version_path.exists():
+        previous = json.loads(version_path.read_text(encoding='utf-8'))
+        if previous.get('hash') == version['hash']:
+            version['generated_at'] = previous['generated_at']
+
+    index['version'] = version['hash']
+    index['generated_at'] = version['generated_at']
+    _write_if_changed(root / 'index.json', _dumps(index))
+    _write_if_changed(version_path, _dumps(version))
+    print(f"✓ Exported {index['total']} listings in {len(index['shards'])} shards "
+          f"and {len(index['summaries'])} summaries to {export_dir} ({written} files changed)")
+    return index
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from .models import ListingSnapshot
+
+
+def data_version(db: Session) -> Tuple[str, Optional[datetime]]:
+    """
+    ETag and Last-Modified for the listings data.
+
+    Every insert or change writes a ListingSnapshot, so the newest snapshot
+    (a primary-key lookup) identifies the current state of the data.
+    """
+    latest = (
+        db.query(ListingSnapshot.id, ListingSnapshot.scraped_at)
+        .order_by(ListingSnapshot.id.desc())
+        .first()
+    )
+    if latest is None:
+        return 'W/"v0"', None
+
+    last_modified = latest.scraped_at
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return f'W/"v{latest.id}"', last_modified
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison, as required for If-None-Match
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in tags)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime]):
+    response.headers["ETag"] = etag
+    # Clients keep the body but revalidate every time
+    response.headers["Cache-Control"] = "no-cache"
+    if last_modified:
+        response.headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
@@ -0,0 +1,176 @@
+from typing import List, Dict, Any
+from datetime import datetime, timezone
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, or_, update
+from .models import Listing, ListingSnapshot
+from .dedup import DuplicateIndex, FINGERPRINT_FIELDS, fingerprint_key
+from .rollups import ROLLUP_DIMENSIONS, RollupTable
+from .stats import save_rollups
+
+DEFAULT_BATCH_SIZE = 500
+
+# Every scraped column; id and scraped_at are filled in by the database
+INSERT_COLUMNS = [c.name for c in Listing.__table__.columns if c.name not in ("id", "scraped_at")]
+
+# Python-side defaults, applied when a scraper leaves a column out
+COLUMN_DEFAULTS = {
+    c.name: c.default.arg for c in Listing.__table__.columns
+    if c.default is not None and not callable(c.default.arg)
+}
+
+# Columns refreshed when a listing is seen again; a change to any of them is snapshotted.
+# A re-scrape that misses one (None) keeps the stored value.
+UPDATE_COLUMNS = ["price", "mileage", "status"]
+
+# Stored columns a price change needs to find the listing's rollup rows
+ROLLUP_COLUMNS = ["source_id", "cluster_id", *(field for field in ROLLUP_DIMENSIONS.values() if field)]
+
+
+def upsert_listings(db: Session, items: List[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Bulk-ingests scraped listings with INSERT ... ON CONFLICT(source_id) DO UPDATE.
+
+    Each batch runs in its own transaction: one SELECT to classify the batch,
+    then one executemany upsert. New and changed listings also get a
+    ListingSnapshot row. New listings get a cluster_id shared with their
+    duplicates on other platforms and are added to today's daily rollups;
+    a price change moves the listing within the rollups of its first day.
+    Returns inserted/updated/unchanged/duplicates counts.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "duplicates": 0}
+
+    # ON CONFLICT is dialect-specific syntax; SQLite and PostgreSQL share its shape
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(Listing)
+    updated = {column: func.coalesce(stmt.excluded[column], Listing.__table__.c[column]) for column in UPDATE_COLUMNS}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Listing.source_id],
+        set_=updated,
+        where=or_(*(Listing.__table__.c[column].is_distinct_from(value) for column, value in updated.items()))
+    )
+
+    for start in range(0, len(items), batch_size):
+        # Later duplicates in a batch win, like the last write would
+        rows = {}
+        for item in items[start:start + batch_size]:
+            if item.get("source_id"):
+                row = {column: item.get(column, COLUMN_DEFAULTS.get(column)) for column in INSERT_COLUMNS}
+                row["fingerprint"] = fingerprint_key(row)
+                rows[item["source_id"]] = row
+        if not rows:
+            continue
+
+        try:
+            existing = {
+                row.source_id: row
+                for row in db.query(*(Listing.__table__.c[column] for column in {*ROLLUP_COLUMNS, *UPDATE_COLUMNS}),
+                                    Listing.scraped_at)
+                .filter(Listing.source_id.in_(list(rows)))
+            }
+            changed = {}
+            for source_id, row in rows.items():
+                current = existing.get(source_id)
+                if current is None:
+                    counts["inserted"] += 1
+                    changed[source_id] = None
+                    continue
+                for column in UPDATE_COLUMNS:
+                    if row[column] is None:
+                        row[column] = getattr(current, column)
+                if any(getattr(current, column) != row[column] for column in UPDATE_COLUMNS):
+                    counts["updated"] += 1
+                    changed[source_id] = current.price
+                else:
+                    counts["unchanged"] += 1
+
+            new_rows = [rows[source_id] for source_id in changed if source_id not in existing]
+            if new_rows:
+                counts["duplicates"] += _assign_clusters(db, new_rows)
+
+            db.execute(stmt, list(rows.values()))
+            if changed:
+                _write_snapshots(db, rows, changed)
+            repriced = [source_id for source_id in changed
+                        if source_id in existing and existing[source_id].price != rows[source_id]["price"]]
+            if new_rows or repriced:
+                # Same transaction as the rows, so the rollups never count a listing twice
+                rollups = RollupTable()
+                day = datetime.now(timezone.utc).date().isoformat()
+                for row in new_rows:
+                    rollups.add(row, day)
+                for source_id in repriced:
+                    current = existing[source_id]
+                    listing = {column: getattr(current, column) for column in ROLLUP_COLUMNS}
+                    listing["price"] = rows[source_id]["price"]
+                    rollups.move(listing, current.scraped_at.date().isoformat(), current.price)
+                save_rollups(db, rollups)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    return counts
+
+
+def _assign_clusters(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    Sets cluster_id on new rows, matching them against stored listings of the same
+    brands and years (the blocks they can fall in) and each other. Returns the duplicate count.
+    """
+    blocks = {row["fingerprint"] for row in rows if row["fingerprint"]}
+    duplicates = DuplicateIndex()
+    if blocks:
+        # Exactly the listings of the rows' blocks, looked up in the fingerprint index
+        candidates = (
+            db.query(Listing.source_id, Listing.cluster_id, *(Listing.__table__.c[field] for field in FINGERPRINT_FIELDS))
+            .filter(Listing.fingerprint.in_(blocks))
+        )
+        for row in candidates:
+            listing = {"source_id": row.source_id, **{field: getattr(row, field) for field in FINGERPRINT_FIELDS}}
+            duplicates.add(listing, row.cluster_id or row.source_id)
+    return duplicates.assign(rows)
+
+
+def backfill_fingerprints(db: Session) -> int:
+    """
+    Fills listings.fingerprint on rows stored before the column existed. Returns the row count.
+    """
+    missing = (
+        db.query(Listing.id, Listing.brand, Listing.model, Listing.production_year)
+        .filter(Listing.fingerprint.is_(None), Listing.brand.isnot(None), Listing.model.isnot(None),
+                Listing.production_year.isnot(None))
+        .all()
+    )
+    updates = [
+        {"id": row.id, "fingerprint": key}
+        for row in missing
+        if (key := fingerprint_key({"brand": row.brand, "model": row.model, "production_year": row.production_year}))
+    ]
+    if updates:
+        db.execute(update(Listing), updates)
+        db.commit()
+    return len(updates)
+
+
+def _write_snapshots(db: Session, rows: Dict[str, Dict[str, Any]], changed: Dict[str, Any]):
+    # changed maps source_id -> previous price (None for new listings)
+    scraped_at = datetime.now(timezone.utc)
+    listing_ids = dict(
+        db.query(Listing.source_id, Listing.id).filter(Listing.source_id.in_(list(changed)))
+    )
+    snapshots = []
+    for source_id, previous_price in changed.items():
+        row = rows[source_id]
+        price_change = None
+        if previous_price is not None and row["price"] is not None:
+            price_change = row["price"] - previous_price
+        snapshots.append({
+            "listing_id": listing_ids[source_id],
+            "scraped_at": scraped_at,
+            "price": row["price"],
+            "mileage": row["mileage"],
+            "status": row["status"],
+            "price_change": price_change,
+        })
+    db.execute(insert(ListingSnapshot), snapshots)
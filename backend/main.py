@@ -1,16 +1,58 @@
-from fastapi import FastAPI, Depends, BackgroundTasks, HTTPException
+from fastapi import FastAPI, Depends, BackgroundTasks, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from .database import engine, Base, get_db
-from .models import Listing
+from .database import engine, Base, get_db, get_read_db, upgrade_schema
+from .models import Listing, ListingSnapshot, DailyRollup
+from .ingest import upsert_listings, backfill_fingerprints
+from .http_cache import data_version, is_not_modified, set_validators
+from .queries import filter_listings, listings_page
+from .stats import DIMENSIONS, StatsCache, price_stats, rollup_stats, rebuild_rollups
 from .scrapers.otomoto import OtomotoScraper
+from .scrapers.browser_pool import BrowserPool
+from .scrapers.parse_pool import ParsePool
 from playwright.async_api import async_playwright
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 import uvicorn
+import os
 
-Base.metadata.create_all(bind=engine)
+upgrade_schema(engine, Base.metadata)
 
-app = FastAPI()
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", 500))
+# Processes parsing scraped pages; 0 parses on the event loop, unset means one per CPU
+PARSE_WORKERS = int(os.environ["PARSE_WORKERS"]) if os.environ.get("PARSE_WORKERS") else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Databases from before the per-dimension rollups existed get them built once
+    db = next(get_db())
+    try:
+        # Listings stored before the fingerprint column get theirs once
+        filled = backfill_fingerprints(db)
+        if filled:
+            print(f"Filled the fingerprint of {filled} listings")
+        if db.query(DailyRollup.id).first() is None and db.query(Listing.id).first() is not None:
+            print(f"Built {rebuild_rollups(db)} daily rollup rows")
+    finally:
+        db.close()
+    # Warm browsers are shared by every background scrape for the app's lifetime
+    playwright = await async_playwright().start()
+    app.state.browser_pool = BrowserPool(playwright)
+    # Parsing stays off the event loop serving API requests
+    app.state.parse_pool = ParsePool(PARSE_WORKERS) if PARSE_WORKERS != 0 else None
+    try:
+        yield
+    finally:
+        if app.state.parse_pool:
+            app.state.parse_pool.close()
+        await app.state.browser_pool.close()
+        await playwright.stop()
+
+app = FastAPI(lifespan=lifespan)
+
+# Grouped statistics, recomputed only after an ingest changes the data
+stats_cache = StatsCache()
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,6 +60,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.get("/")
@@ -26,43 +69,133 @@ def read_root():
 
 @app.get("/listings")
 def get_listings(
+    request: Request,
+    response: Response,
+    cursor: Optional[int] = None,
     skip: int = 0, 
     limit: int = 100, 
+    platform: Optional[str] = None,
+    brand: Optional[str] = None,
+    model: Optional[str] = None,
+    fuel_type: Optional[str] = None,
     min_price: Optional[float] = None, 
     max_price: Optional[float] = None,
-    db: Session = Depends(get_db)
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    min_mileage: Optional[int] = None,
+    max_mileage: Optional[int] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Listings newest first. Pass the X-Next-Cursor header of a page as ``cursor`` to
+    get the next one; ``skip`` still works but gets slower the deeper it goes.
+    """
+    # Polling clients get a 304 until a scrape lands new or changed listings
+    etag, last_modified = data_version(db)
+    if is_not_modified(request, etag, last_modified):
+        not_modified = Response(status_code=304)
+        set_validators(not_modified, etag, last_modified)
+        return not_modified
+    set_validators(response, etag, last_modified)
+    
+    query = filter_listings(
+        db.query(Listing), platform, brand, model, fuel_type,
+        min_price, max_price, min_year, max_year, min_mileage, max_mileage,
+    )
+    listings = listings_page(query, cursor, skip, limit)
+    if len(listings) == limit:
+        response.headers["X-Next-Cursor"] = str(listings[-1].id)
+    return listings
+
+@app.get("/stats/{dimension}")
+def get_stats(
+    dimension: str,
+    request: Request,
+    response: Response,
+    dedupe: bool = True,
+    exact: bool = False,
+    platform: Optional[str] = None,
+    brand: Optional[str] = None,
+    model: Optional[str] = None,
+    fuel_type: Optional[str] = None,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Listing)
-    if min_price:
-        query = query.filter(Listing.price >= min_price)
-    if max_price:
-        query = query.filter(Listing.price <= max_price)
+    """
+    Price count/avg/min/max and percentiles grouped by year, brand, model, date, platform or fuel.
+
+    Current prices, each car once. Unfiltered, read from the daily rollups with
+    percentiles within 1%; filtered requests, ``exact`` and ``dedupe=false`` (every
+    listing counted) aggregate the listings instead.
+    """
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown dimension, use one of: {', '.join(DIMENSIONS)}")
+    
+    etag, last_modified = data_version(db)
+    if is_not_modified(request, etag, last_modified):
+        not_modified = Response(status_code=304)
+        set_validators(not_modified, etag, last_modified)
+        return not_modified
+    set_validators(response, etag, last_modified)
     
-    return query.offset(skip).limit(limit).all()
+    filters = dict(platform=platform, brand=brand, model=model, fuel_type=fuel_type,
+                   min_year=min_year, max_year=max_year)
+    key = (dimension, dedupe, exact, *filters.values())
+    rows = stats_cache.get(etag, key)
+    if rows is None:
+        if exact or not dedupe or any(value is not None for value in filters.values()):
+            rows = price_stats(db, dimension, dedupe, **filters)
+        else:
+            rows = rollup_stats(db, dimension)
+        stats_cache.put(etag, key, rows)
+    return rows
+
+@app.get("/listings/{listing_id}/history")
+def get_listing_history(listing_id: int, db: Session = Depends(get_read_db)):
+    return (
+        db.query(ListingSnapshot)
+        .filter(ListingSnapshot.listing_id == listing_id)
+        .order_by(ListingSnapshot.scraped_at)
+        .all()
+    )
+
+@app.get("/price-drops")
+def get_price_drops(days: int = 7, limit: int = 100, db: Session = Depends(get_read_db)):
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    return (
+        db.query(ListingSnapshot)
+        .filter(ListingSnapshot.price_change < 0, ListingSnapshot.scraped_at >= since)
+        .order_by(ListingSnapshot.scraped_at.desc())
+        .limit(limit)
+        .all()
+    )
 
 async def run_scraper_task(search_url: str):
     # This should be more robust in production, creating separate sessions
-    async with async_playwright() as p:
-        scraper = OtomotoScraper()
-        data = await scraper.scrape(p, search_url, limit_pages=2)
-        
-        # Save to DB
-        db = next(get_db())
-        try:
-            for item in data:
-                # Check duplication
-                exists = db.query(Listing).filter(Listing.source_id == item["source_id"]).first()
-                if not exists:
-                    listing = Listing(**item)
-                    db.add(listing)
-                else:
-                    # Update price/data?
-                    pass
-            db.commit()
-        except Exception as e:
-            print(f"DB Error: {e}")
-        finally:
-            db.close()
+    scraper = OtomotoScraper()
+    scraper.parse_pool = app.state.parse_pool
+    
+    # Save to DB page by page, so a failure later in the scrape keeps the pages already ingested
+    db = next(get_db())
+    totals = {"inserted": 0, "updated": 0, "unchanged": 0}
+    try:
+        async for page in scraper.scrape(app.state.browser_pool, search_url, limit_pages=2):
+            try:
+                counts = upsert_listings(db, page.listings, batch_size=INGEST_BATCH_SIZE)
+            except Exception as e:
+                print(f"DB Error: {e}")
+                continue
+            for key in totals:
+                totals[key] += counts[key]
+        print(f"Ingested {sum(totals.values())} listings: {totals}")
+    finally:
+        db.close()
+        await scraper.close()
+
+@app.get("/browser-pool")
+def browser_pool_stats():
+    return app.state.browser_pool.stats
 
 @app.post("/scrape")
 async def trigger_scrape(search_url: str, background_tasks: BackgroundTasks):
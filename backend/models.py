@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -10,7 +10,7 @@ class Listing(Base):
     source_url = Column(String)
     platform = Column(String)  # otomoto, olx, etc.
     
-    brand = Column(String, index=True)
+    brand = Column(String)
     model = Column(String, index=True)
     generation = Column(String, nullable=True)
     
@@ -29,6 +29,70 @@ class Listing(Base):
     condition = Column(String, nullable=True) # used, new, damage
     
     location = Column(String, nullable=True)
+    status = Column(String, default="active") # active, removed
     
     created_at_source = Column(String, nullable=True) # Raw string for now, parse if possible
     scraped_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # source_id of the first listing seen of the same car on any platform, see dedup.py
+    cluster_id = Column(String, nullable=True, index=True)
+    # Normalized brand|model|year, the block dedup.py matches within (dedup.fingerprint_key)
+    fingerprint = Column(String, nullable=True, index=True)
+
+    __table_args__ = (
+        # /listings pages newest first by (scraped_at, id); each index pairs an equality
+        # filter with that order, so a page is an index range scan whatever its depth.
+        # Range filters (price, year, mileage) are checked against the rows walked.
+        Index("ix_listings_scraped", "scraped_at", "id"),
+        Index("ix_listings_platform_scraped", "platform", "scraped_at", "id"),
+        Index("ix_listings_brand_model_scraped", "brand", "model", "scraped_at", "id"),
+        Index("ix_listings_fuel_scraped", "fuel_type", "scraped_at", "id"),
+    )
+
+
+class ListingSnapshot(Base):
+    """
+    Price history: one row per listing whenever price, mileage or status changed
+    (including the first time the listing was seen).
+    """
+    __tablename__ = "listing_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    listing_id = Column(Integer, ForeignKey("listings.id"), nullable=False)
+    scraped_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    price = Column(Float, nullable=True)
+    mileage = Column(Integer, nullable=True)
+    status = Column(String, nullable=True)
+    price_change = Column(Float, nullable=True) # vs. the previous snapshot, negative for drops
+
+    __table_args__ = (
+        # Price trajectory for one listing
+        Index("ix_listing_snapshots_listing_scraped", "listing_id", "scraped_at", unique=True),
+        # Recent price drops; partial so only drops are indexed
+        Index("ix_listing_snapshots_drops", "scraped_at",
+              sqlite_where=price_change < 0, postgresql_where=price_change < 0),
+    )
+
+
+class DailyRollup(Base):
+    """
+    Price aggregates of the listings first seen on a day, per chart dimension and value
+    (see rollups.py). Maintained by upsert_listings, rebuilt by `python -m backend.stats`.
+    """
+    __tablename__ = "daily_dimension_rollups"
+
+    id = Column(Integer, primary_key=True)
+    day = Column(String, nullable=False) # YYYY-MM-DD
+    dimension = Column(String, nullable=False) # year, brand, model, date, platform or fuel
+    value = Column(String, nullable=False) # "2019", "BMW", the day itself for date, ...
+
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0.0)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+    sketch = Column(Text, nullable=False, default="[]") # PriceSketch [index, count] pairs as JSON
+
+    __table_args__ = (
+        Index("ix_daily_dimension_rollups_key", "day", "dimension", "value", unique=True),
+    )
@@ -0,0 +1,57 @@
+"""
+Listing queries shared by the API endpoints: filters and keyset pagination.
+"""
+
+from typing import List, Optional
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Query
+from .models import Listing
+
+
+def filter_listings(
+    query: Query,
+    platform: Optional[str] = None,
+    brand: Optional[str] = None,
+    model: Optional[str] = None,
+    fuel_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    min_mileage: Optional[int] = None,
+    max_mileage: Optional[int] = None,
+) -> Query:
+    """
+    Equality filters on platform, brand, model and fuel; inclusive ranges on price, year and mileage.
+    """
+    for column, value in ((Listing.platform, platform), (Listing.brand, brand),
+                          (Listing.model, model), (Listing.fuel_type, fuel_type)):
+        if value is not None:
+            query = query.filter(column == value)
+    for column, low, high in ((Listing.price, min_price, max_price),
+                              (Listing.production_year, min_year, max_year),
+                              (Listing.mileage, min_mileage, max_mileage)):
+        if low is not None:
+            query = query.filter(column >= low)
+        if high is not None:
+            query = query.filter(column <= high)
+    return query
+
+
+def listings_page(query: Query, cursor: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Listing]:
+    """
+    One page of `query`, newest first by (scraped_at, id).
+
+    `cursor` is the id of the previous page's last listing: the page starts right after
+    it in that order, an index range scan that costs the same at any depth. `skip` is
+    the old OFFSET paging, which reads and discards every skipped row.
+    """
+    if cursor is not None:
+        # The cursor's timestamp is read back by primary key, so it is compared in the
+        # stored format rather than re-serialized from Python
+        anchor = select(Listing.scraped_at).where(Listing.id == cursor).scalar_subquery()
+        query = query.filter(tuple_(Listing.scraped_at, Listing.id) < tuple_(anchor, cursor))
+    query = query.order_by(Listing.scraped_at.desc(), Listing.id.desc())
+    if skip and cursor is None:
+        query = query.offset(skip)
+    return query.limit(limit).all()
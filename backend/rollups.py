@@ -0,0 +1,195 @@
+"""
+Daily price rollups: per (day, dimension, value) the count, sum, min, max and a mergeable
+price sketch of the current prices of the listings first seen that day. A price change
+moves the listing's contribution, so the rollups agree with the exact statistics.
+
+Each listing is rolled up once per chart dimension (year, brand, model, platform, fuel and
+the day itself), so a day is a few dozen rows however many listings it brings, and a
+series over a year of data merges thousands of rows instead of reading the listings.
+The rollups keep no combinations of values: filtered statistics come from the listings.
+A car listed on several platforms is rolled up once, by its cluster's first listing.
+"""
+
+import math
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+# Columns of the rollup key, in order; "day" is the date the listing was first seen and
+# "value" the listing's value for the dimension, as a string
+ROLLUP_KEY = ('day', 'dimension', 'value')
+
+# Dimension name -> listing field rolled up under it; "date" groups on the first-seen day
+ROLLUP_DIMENSIONS = {
+    'year': 'production_year',
+    'brand': 'brand',
+    'model': 'model',
+    'date': None,
+    'platform': 'platform',
+    'fuel': 'fuel_type',
+}
+
+# Relative error of the sketch's quantiles
+SKETCH_ACCURACY = 0.01
+
+
+class PriceSketch:
+    """
+    Log-bucketed histogram of prices (the DDSketch layout): bucket i holds prices in
+    (gamma^(i-1), gamma^i], so any quantile is within SKETCH_ACCURACY of the true value.
+    Merging two sketches adds their bucket counts, which makes daily rollups combinable
+    into any coarser grouping.
+    """
+
+    GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+    _LOG_GAMMA = math.log(GAMMA)
+
+    def __init__(self, buckets: Optional[Dict[int, int]] = None):
+        self.buckets: Dict[int, int] = buckets or {}
+
+    def add(self, price: float, count: int = 1):
+        """
+        Adds `count` prices (negative to take them back out).
+        """
+        index = math.ceil(math.log(price) / self._LOG_GAMMA)
+        count += self.buckets.get(index, 0)
+        if count > 0:
+            self.buckets[index] = count
+        else:
+            self.buckets.pop(index, None)
+
+    def merge(self, other: "PriceSketch"):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def quantile(self, percentile: float) -> Optional[float]:
+        """
+        Nearest-rank percentile (0-100), like the exact /stats query.
+        """
+        total = sum(self.buckets.values())
+        if not total:
+            return None
+        rank = max(1, math.ceil(total * percentile / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return 2 * self.GAMMA ** index / (self.GAMMA + 1)
+        return None
+
+    def to_json(self) -> List[Tuple[int, int]]:
+        # [index, count] pairs rather than an object, so loading needs no str -> int conversion
+        return sorted(self.buckets.items())
+
+    @classmethod
+    def from_json(cls, data: Optional[List[List[int]]]) -> "PriceSketch":
+        return cls(dict(data or ()))
+
+
+class RollupRow:
+    __slots__ = ('count', 'total', 'min_price', 'max_price', 'sketch')
+
+    def __init__(self, count: int = 0, total: float = 0.0, min_price: Optional[float] = None,
+                 max_price: Optional[float] = None, sketch: Optional[PriceSketch] = None):
+        self.count = count
+        self.total = total
+        self.min_price = min_price
+        self.max_price = max_price
+        self.sketch = sketch or PriceSketch()
+
+    def add(self, price: float):
+        self.count += 1
+        self.total += price
+        self.min_price = price if self.min_price is None else min(self.min_price, price)
+        self.max_price = price if self.max_price is None else max(self.max_price, price)
+        self.sketch.add(price)
+
+    def remove(self, price: float):
+        """
+        Takes one listing at `price` back out. min_price and max_price can only be
+        narrowed from the listings themselves, see stats.save_rollups.
+        """
+        self.count -= 1
+        self.total -= price
+        self.sketch.add(price, -1)
+
+    def merge(self, other: "RollupRow"):
+        if not other.count:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.min_price = other.min_price if self.min_price is None else min(self.min_price, other.min_price)
+        self.max_price = other.max_price if self.max_price is None else max(self.max_price, other.max_price)
+        self.sketch.merge(other.sketch)
+
+    def quantile(self, percentile: float) -> Optional[float]:
+        """
+        The sketch's quantile, clamped to the observed prices: a bucket's midpoint can
+        lie below the cheapest or above the dearest listing in it.
+        """
+        value = self.sketch.quantile(percentile)
+        if value is None:
+            return None
+        return min(max(value, self.min_price), self.max_price)
+
+
+def counts_in_rollups(listing: Dict[str, Any]) -> bool:
+    """
+    Priced listings that represent their duplicate cluster (see dedup.py).
+    """
+    if not listing.get('price') or listing['price'] <= 0:
+        return False
+    cluster_id = listing.get('cluster_id')
+    return cluster_id is None or cluster_id == listing.get('source_id')
+
+
+class RollupTable:
+    """
+    Rollup rows by key, built from listings or loaded from the database.
+    """
+
+    def __init__(self):
+        self.rows: Dict[Tuple, RollupRow] = {}
+        # Prices to take out of the stored rows, per key
+        self.removed: Dict[Tuple, List[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, listing: Dict[str, Any], day: str) -> bool:
+        """
+        Rolls up one listing first seen on `day`, at its current price.
+        """
+        if not counts_in_rollups(listing):
+            return False
+        for key in _keys(listing, day):
+            row = self.rows.get(key)
+            if row is None:
+                row = self.rows[key] = RollupRow()
+            row.add(listing['price'])
+        return True
+
+    def move(self, listing: Dict[str, Any], day: str, previous_price: Optional[float]):
+        """
+        A stored listing first seen on `day` whose price changed from `previous_price`:
+        the old price leaves its rows, the current one is added.
+        """
+        if counts_in_rollups({**listing, 'price': previous_price}):
+            for key in _keys(listing, day):
+                self.removed.setdefault(key, []).append(previous_price)
+        self.add(listing, day)
+
+
+def _keys(listing: Dict[str, Any], day: str) -> Iterator[Tuple]:
+    for dimension, field in ROLLUP_DIMENSIONS.items():
+        value = day if field is None else listing.get(field)
+        if value is not None:
+            yield day, dimension, str(value)
+
+
+def build_rollups(listings: Iterable[Tuple[Dict[str, Any], str]]) -> RollupTable:
+    """
+    A table from (listing, first-seen day) pairs, for rebuilds.
+    """
+    table = RollupTable()
+    for listing, day in listings:
+        table.add(listing, day)
+    return table
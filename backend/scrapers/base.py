@@ -1,17 +1,333 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
-from playwright.async_api import Page
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, NamedTuple
+from urllib.parse import urljoin, urlparse, parse_qs, urlencode, urlunparse
+from playwright.async_api import Page, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from .throttle import DomainRateLimiter, RetryableError
+from .blocking import RequestBlocker
+from .html_parsing import resolve_backend, parse_html
+from .http_fetcher import HttpFetcher
+
+class ScrapedPage(NamedTuple):
+    """
+    One result page as yielded by BaseScraper.scrape.
+    """
+    page_num: int  # 0-based
+    url: str
+    next_url: Optional[str]
+    listings: List[Dict[str, Any]]
+    error: Optional[str] = None
+
 
 class BaseScraper(ABC):
-    def __init__(self, platform_name: str):
+    # Browser settings used when leasing a context from the BrowserPool
+    headless = True
+    user_agent = None
+
+    # Page layout, set by each platform
+    log_prefix = ""
+    listing_selectors: List[str] = []  # Tried in order until one matches
+    next_page_selector: Optional[str] = None
+    cookie_selector: Optional[str] = None
+    cookie_timeout = 3000
+
+    # Query parameter holding the result page number, if the platform's URLs are predictable
+    page_param: Optional[str] = None
+
+    # Query parameters that sort results newest first, used by incremental crawls
+    newest_first_params: Dict[str, str] = {}
+
+    # "selector" waits for the first listing card, "networkidle" for all network activity to stop
+    wait_strategy = "selector"
+    selector_timeout = 15000
+
+    # HTML parser backend, see scrapers/html_parsing.py; "auto" takes the fastest one installed
+    html_parser = "auto"
+
+    # "auto" reads listings from the page's embedded JSON state when the platform has one
+    # (see parse_embedded) and falls back to the cards; "dom" always parses the cards
+    extract_mode = "auto"
+
+    # "browser" loads pages in Chromium, "http" fetches the HTML directly (server-rendered pages only)
+    fetch_mode = "browser"
+
+    def __init__(self, platform_name: str, rate_limiter: Optional[DomainRateLimiter] = None):
         self.platform_name = platform_name
+        self.rate_limiter = rate_limiter or DomainRateLimiter()
+        self.blocker = RequestBlocker()
+        self.html_backend = resolve_backend(self.html_parser)
+        # ParsePool set by the caller; without one, pages are parsed on the event loop
+        self.parse_pool = None
+        self.http_fetcher: Optional[HttpFetcher] = None
+        # PageCache set by the caller; fetched HTML is kept there for replay
+        self.page_cache = None
+        self.page_stats = {"pages": 0, "load_seconds": 0.0}
 
-    @abstractmethod
-    async def scrape(self, playwright, search_url: str, limit_pages: int = 1) -> List[Dict[str, Any]]:
+    def configure(self, settings: Dict[str, Any]):
         """
-        Scrapes listings from a given search URL.
+        Applies a platform's settings from the "platforms" section of scraper_config.json.
         """
-        pass
+        self.wait_strategy = settings.get("wait", self.wait_strategy)
+        if "block" in settings:
+            self.blocker = RequestBlocker.from_config(settings["block"])
+        if "parser" in settings:
+            self.html_backend = resolve_backend(settings["parser"])
+        self.extract_mode = settings.get("extract", self.extract_mode)
+        self.fetch_mode = settings.get("fetch", self.fetch_mode)
+
+    def report_stats(self) -> str:
+        pages = self.page_stats["pages"]
+        blocked = self.blocker.stats
+        avg_load = self.page_stats["load_seconds"] / pages if pages else 0.0
+        stats = f"pages={pages}, avg_load={avg_load:.2f}s, parser={self.html_backend}, "
+        if self.fetch_mode == "http" and self.http_fetcher:
+            return stats + f"fetch=http, {self.http_fetcher.report()}"
+        return stats + (f"blocked_requests={blocked['blocked_requests']} {blocked['blocked_by_type']}, "
+                        f"loaded_requests={blocked['loaded_requests']}, loaded_kb={blocked['loaded_bytes'] // 1024}")
+
+    async def scrape(self, pool, search_url: str, limit_pages: int = 1, tabs: int = 1,
+                     start_page: int = 0, start_url: Optional[str] = None) -> AsyncIterator[ScrapedPage]:
+        """
+        Scrapes listings from a given search URL, using a context leased from `pool` (BrowserPool),
+        or plain HTTP requests in "http" fetch mode.
+
+        Yields a ScrapedPage per result page as soon as it is parsed (failed pages carry
+        `error`); the next page is only fetched once the consumer asks for it. With `tabs` > 1
+        and predictable page URLs, up to `tabs` result pages are fetched at once.
+        `start_page`/`start_url` resume a crawl at a later page.
+        """
+        if self.fetch_mode == "http":
+            if self.http_fetcher is None:
+                self.http_fetcher = HttpFetcher(user_agent=self.user_agent)
+            async for page in self._scrape_pages(self._http_tab, search_url, limit_pages, tabs, start_page, start_url):
+                yield page
+            return
+
+        async with pool.context(headless=self.headless, user_agent=self.user_agent) as lease:
+            async for page in self._scrape_pages(lambda: self._browser_tab(lease), search_url, limit_pages, tabs,
+                                                 start_page, start_url):
+                yield page
+
+    async def close(self):
+        """
+        Releases the scraper's own connections (the browser pool is closed by its owner).
+        """
+        if self.http_fetcher:
+            await self.http_fetcher.aclose()
+            self.http_fetcher = None
+
+    def _scrape_pages(self, new_tab, search_url: str, limit_pages: int, tabs: int,
+                      start_page: int = 0, start_url: Optional[str] = None) -> AsyncIterator[ScrapedPage]:
+        if tabs > 1 and self.page_param and limit_pages - start_page > 1:
+            return self._scrape_parallel(new_tab, search_url, limit_pages, tabs, start_page)
+        return self._scrape_sequential(new_tab, search_url, limit_pages, start_page, start_url)
+
+    async def _browser_tab(self, lease) -> "BrowserTab":
+        return BrowserTab(self, await self._open_page(lease), lease)
+
+    async def _open_page(self, lease) -> Page:
+        page = await lease.new_page()
+        await self.blocker.attach(page)
+        return page
+
+    async def _http_tab(self) -> HttpFetcher:
+        # Requests share the fetcher's client, so every "tab" is the fetcher itself
+        return self.http_fetcher
+
+    async def _scrape_sequential(self, new_tab, search_url: str, limit_pages: int, start_page: int = 0,
+                                 start_url: Optional[str] = None) -> AsyncIterator[ScrapedPage]:
+        tab = await new_tab()
+        try:
+            current_url = start_url or (self.page_url(search_url, start_page) if self.page_param else search_url)
+            for page_num in range(start_page, limit_pages):
+                try:
+                    listings, next_url = await self._fetch_and_parse(tab, current_url, page_num)
+                except Exception as e:
+                    print(f"{self.log_prefix}Error scraping page {current_url}: {e}")
+                    yield ScrapedPage(page_num, current_url, None, [], str(e))
+                    if not self.page_param:
+                        break
+                    # Predictable URLs let us skip a page that keeps failing
+                    current_url = self.page_url(search_url, page_num + 1)
+                    continue
+
+                yield ScrapedPage(page_num, current_url, next_url, listings)
+                if not next_url:
+                    break
+                current_url = next_url
+        finally:
+            await tab.close()
+
+    async def _scrape_parallel(self, new_tab, search_url: str, limit_pages: int, tabs: int,
+                               start_page: int = 0) -> AsyncIterator[ScrapedPage]:
+        pages = [await new_tab() for _ in range(min(tabs, limit_pages - start_page))]
+        try:
+            for batch_start in range(start_page, limit_pages, len(pages)):
+                page_nums = range(batch_start, min(batch_start + len(pages), limit_pages))
+                batch = await asyncio.gather(
+                    *(self._fetch_and_parse(page, self.page_url(search_url, page_num), page_num)
+                      for page, page_num in zip(pages, page_nums)),
+                    return_exceptions=True
+                )
+
+                # Consume in page order, skipping failed pages and stopping at the last page
+                for page_num, outcome in zip(page_nums, batch):
+                    url = self.page_url(search_url, page_num)
+                    if isinstance(outcome, Exception):
+                        print(f"{self.log_prefix}Error scraping page {url}: {outcome}")
+                        yield ScrapedPage(page_num, url, None, [], str(outcome))
+                        continue
+                    listings, next_url = outcome
+                    yield ScrapedPage(page_num, url, next_url, listings)
+                    if not next_url:
+                        return
+        finally:
+            for page in pages:
+                await page.close()
+
+    async def _fetch_and_parse(self, tab, url: str, page_num: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        max_retries = self.rate_limiter.max_retries
+        for attempt in range(max_retries + 1):
+            await self.rate_limiter.wait(url)
+            print(f"{self.log_prefix}Scraping page {page_num + 1}: {url}")
+            started = time.monotonic()
+            try:
+                content = await tab.load(url)
+                break
+            except RetryableError as e:
+                if attempt == max_retries:
+                    raise
+                delay = self.rate_limiter.backoff(url, attempt)
+                print(f"{self.log_prefix}{e} on page {page_num + 1}, retrying in {delay:.1f}s")
+
+        self.page_stats["pages"] += 1
+        self.page_stats["load_seconds"] += time.monotonic() - started
+        if self.page_cache:
+            self.page_cache.put(self.platform_name, url, content)
+
+        listings, next_url = await self.parse(content, url)
+        print(f"{self.log_prefix}Found {len(listings)} listings on page {page_num + 1}")
+        return listings, next_url
+
+    async def parse(self, content: str, url: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Parses fetched HTML in the parse pool when there is one, otherwise on the event loop.
+        """
+        if self.parse_pool:
+            return await self.parse_pool.parse(self.platform_name, content, url, self.parse_options())
+        return self.parse_content(content, url)
+
+    async def load_page(self, page: Page, url: str):
+        """
+        Navigates to `url`. Raises RetryableError on 429, 5xx, navigation timeouts
+        and network errors (net::ERR_*, like connection errors in HTTP mode).
+        """
+        wait_for_cards = self.wait_strategy == "selector" and self.listing_selectors
+        try:
+            response = await page.goto(url, timeout=60000,
+                                       wait_until="domcontentloaded" if wait_for_cards else "load")
+        except PlaywrightTimeoutError:
+            raise RetryableError("Timeout")
+        except PlaywrightError as e:
+            if "net::ERR_" not in e.message:
+                raise
+            raise RetryableError(f"Connection error: {e.message.splitlines()[0]}")
+
+        if response and (response.status == 429 or response.status >= 500):
+            raise RetryableError(f"HTTP {response.status}", response.status)
+
+        if wait_for_cards:
+            try:
+                await page.wait_for_selector(", ".join(self.listing_selectors), state="attached",
+                                             timeout=self.selector_timeout)
+            except PlaywrightTimeoutError:
+                # No cards (e.g. past the last page) - parse whatever was rendered
+                pass
+        else:
+            try:
+                await page.wait_for_load_state("networkidle")
+            except PlaywrightTimeoutError:
+                raise RetryableError("Timeout")
+
+    async def accept_cookies(self, page: Page):
+        # Only click when the banner is there, so warm contexts don't wait out the timeout
+        if not self.cookie_selector:
+            return
+        try:
+            if await page.query_selector(self.cookie_selector):
+                await page.click(self.cookie_selector, timeout=self.cookie_timeout)
+        except Exception:
+            # Banner gone or not clickable; cancellation still propagates
+            pass
+
+    def page_url(self, search_url: str, page_num: int) -> str:
+        """
+        Builds the URL of result page `page_num` (0-based) for platforms with a `page_param`.
+        """
+        if page_num == 0:
+            return search_url
+        parts = urlparse(search_url)
+        query = parse_qs(parts.query)
+        query[self.page_param] = [str(page_num + 1)]
+        return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+    def newest_first_url(self, search_url: str) -> str:
+        """
+        `search_url` with the platform's newest-first sort order, if it has one.
+        """
+        if not self.newest_first_params:
+            return search_url
+        parts = urlparse(search_url)
+        query = parse_qs(parts.query)
+        for name, value in self.newest_first_params.items():
+            query[name] = [value]
+        return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+    def parse_options(self) -> Dict[str, Any]:
+        # Configured parse settings, handed to parse_content in pool workers
+        return {"backend": self.html_backend, "extract": self.extract_mode}
+
+    def parse_content(self, content: str, url: str, backend: Optional[str] = None,
+                      extract: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Parses a result page's HTML into (listings, next page URL).
+        """
+        document = parse_html(content, backend or self.html_backend)
+        listings = None
+        if (extract or self.extract_mode) == "auto":
+            try:
+                listings = self.parse_embedded(document)
+            except Exception as e:
+                print(f"{self.log_prefix}Error reading embedded listings, parsing cards instead: {e}")
+        if not listings:
+            listings = self.parse_page(document)
+        return listings, self.next_page_url(document, url)
+
+    def parse_embedded(self, document) -> Optional[List[Dict[str, Any]]]:
+        """
+        Listings from the page's embedded JSON state, or None when there is none.
+        """
+        return None
+
+    def parse_page(self, document) -> List[Dict[str, Any]]:
+        listings = []
+        for card in document.select_cards(self.listing_selectors):
+            try:
+                data = self.parse_listing(card)
+                if data:
+                    listings.append(data)
+            except Exception as e:
+                print(f"{self.log_prefix}Error parsing listing: {e}")
+        return listings
+
+    def next_page_url(self, document, current_url: str) -> Optional[str]:
+        if not self.next_page_selector:
+            return None
+        href = document.select_href(self.next_page_selector)
+        if href:
+            return urljoin(current_url, href)
+        return None
 
     @abstractmethod
     def parse_listing(self, html_content: str) -> Dict[str, Any]:
@@ -20,3 +336,26 @@ class BaseScraper(ABC):
         """
         pass
 
+
+class BrowserTab:
+    """
+    A browser page leased for one scrape, loading result pages the way the scraper configures.
+    """
+
+    def __init__(self, scraper: BaseScraper, page: Page, lease):
+        self.scraper = scraper
+        self.page = page
+        self.lease = lease
+
+    async def load(self, url: str) -> str:
+        if self.lease.due(self.page):
+            # The browser has served its pages: continue on a fresh one
+            page, self.page = self.page, await self.scraper._open_page(self.lease)
+            await self.lease.close_page(page)
+        await self.scraper.load_page(self.page, url)
+        self.lease.record_page()
+        await self.scraper.accept_cookies(self.page)
+        return await self.page.content()
+
+    async def close(self):
+        await self.lease.close_page(self.page)
@@ -0,0 +1,101 @@
+from typing import Dict, Any, Iterable, Optional
+from urllib.parse import urlparse
+
+# Only the listing-card HTML matters, so nothing visual is ever loaded
+DEFAULT_BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
+
+# Ad, analytics and tracking hosts seen on the scraped sites
+DEFAULT_DENY_HOSTS = [
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "google-analytics.com",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "criteo.com",
+    "criteo.net",
+    "adnxs.com",
+    "rubiconproject.com",
+    "pubmatic.com",
+    "scorecardresearch.com",
+    "gemius.pl",
+    "hit.gemius.pl",
+    "ninja.data.olxcdn.com",
+    "tiktok.com",
+    "clarity.ms",
+]
+
+
+def _host_matches(host: str, patterns: Iterable[str]) -> bool:
+    return any(host == pattern or host.endswith("." + pattern) for pattern in patterns)
+
+
+class RequestBlocker:
+    """
+    Aborts requests for blocked resource types and ad/analytics hosts on a page.
+
+    `allow_hosts` always wins over the blocked types and `deny_hosts`.
+    Counts are collected in `stats`; the size of an aborted request is never
+    downloaded, so bandwidth is tracked as bytes actually loaded.
+    """
+
+    def __init__(self, resource_types: Optional[Iterable[str]] = None,
+                 allow_hosts: Optional[Iterable[str]] = None,
+                 deny_hosts: Optional[Iterable[str]] = None,
+                 enabled: bool = True):
+        self.resource_types = set(DEFAULT_BLOCKED_RESOURCE_TYPES if resource_types is None else resource_types)
+        self.allow_hosts = list(allow_hosts or [])
+        self.deny_hosts = list(DEFAULT_DENY_HOSTS if deny_hosts is None else deny_hosts)
+        self.enabled = enabled
+        self.stats: Dict[str, Any] = {
+            "blocked_requests": 0,
+            "blocked_by_type": {},
+            "loaded_requests": 0,
+            "loaded_bytes": 0,
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RequestBlocker":
+        """
+        Builds a blocker from a platform's "block" settings in scraper_config.json.
+        Extra `deny_hosts` are added to the defaults.
+        """
+        return cls(
+            resource_types=config.get("resource_types"),
+            allow_hosts=config.get("allow_hosts"),
+            deny_hosts=DEFAULT_DENY_HOSTS + config.get("deny_hosts", []),
+            enabled=config.get("enabled", True),
+        )
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        host = urlparse(url).hostname or ""
+        if _host_matches(host, self.allow_hosts):
+            return False
+        return resource_type in self.resource_types or _host_matches(host, self.deny_hosts)
+
+    async def attach(self, page):
+        page.on("requestfinished", self._on_finished)
+        if self.enabled:
+            await page.route("**/*", self._handle_route)
+
+    async def _handle_route(self, route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.stats["blocked_requests"] += 1
+            by_type = self.stats["blocked_by_type"]
+            by_type[request.resource_type] = by_type.get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _on_finished(self, request):
+        self.stats["loaded_requests"] += 1
+        try:
+            sizes = await request.sizes()
+            self.stats["loaded_bytes"] += sizes["responseHeadersSize"] + sizes["responseBodySize"]
+        except Exception:
+            pass
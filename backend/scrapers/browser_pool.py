@@ -0,0 +1,200 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+class _PooledBrowser:
+    def __init__(self, browser, headless: bool):
+        self.browser = browser
+        self.headless = headless
+        self.pages = 0
+        self.leases = 0
+        self.retired = False
+
+
+class PooledContext:
+    """
+    A browser context leased from the pool.
+    Scrapers open their pages with `new_page()`, call `record_page()` per loaded page
+    and check `due(page)` between pages: once the browser has served its pages, the
+    lease moves to a context on a fresh browser and the old one is closed when its
+    last page is.
+    """
+
+    def __init__(self, pool: "BrowserPool", owner: _PooledBrowser, context, key: Tuple[bool, Optional[str]]):
+        self.pool = pool
+        self.owner = owner
+        self.context = context
+        self.key = key
+        self._open: Dict[object, int] = {}
+        self._draining: Dict[object, _PooledBrowser] = {}
+
+    def record_page(self):
+        self.owner.pages += 1
+        self.pool.stats["pages_served"] += 1
+
+    def due(self, page) -> bool:
+        """
+        Whether `page` should be reopened before loading the next result page.
+        """
+        return page.context is not self.context or self.owner.pages >= self.pool.max_pages_per_browser
+
+    async def new_page(self):
+        if self.owner.pages >= self.pool.max_pages_per_browser:
+            await self.pool.rotate(self)
+        page = await self.context.new_page()
+        self._open[page.context] = self._open.get(page.context, 0) + 1
+        return page
+
+    async def close_page(self, page):
+        context = page.context
+        await page.close()
+        self._open[context] = self._open.get(context, 0) - 1
+        if context in self._draining:
+            await self.pool.close_drained(self)
+
+
+class BrowserPool:
+    """
+    Keeps Chromium browsers and contexts warm across scrape() calls.
+
+    One browser is kept per headless mode. Contexts are reused per
+    (headless, user_agent) pair, and a browser is recycled once it has
+    served `max_pages_per_browser` pages, also between the pages of a lease.
+    """
+
+    def __init__(self, playwright, max_pages_per_browser: int = 50, max_idle_contexts: int = 4):
+        self.playwright = playwright
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_idle_contexts = max_idle_contexts
+        self._browsers: Dict[bool, _PooledBrowser] = {}
+        self._idle: Dict[Tuple[bool, Optional[str]], List[PooledContext]] = {}
+        self._lock = asyncio.Lock()
+        self.stats = {
+            "browser_launches": 0,
+            "browser_recycles": 0,
+            "contexts_created": 0,
+            "context_reuses": 0,
+            "pages_served": 0,
+        }
+
+    async def _launch(self, headless: bool) -> _PooledBrowser:
+        browser = await self.playwright.chromium.launch(headless=headless)
+        self.stats["browser_launches"] += 1
+        pooled = _PooledBrowser(browser, headless)
+        self._browsers[headless] = pooled
+        return pooled
+
+    async def _retire(self, pooled: _PooledBrowser):
+        pooled.retired = True
+        self._browsers.pop(pooled.headless, None)
+        self.stats["browser_recycles"] += 1
+
+        # Idle contexts of a retired browser are never handed out again
+        for key, idle in self._idle.items():
+            keep = []
+            for lease in idle:
+                if lease.owner is pooled:
+                    await lease.context.close()
+                else:
+                    keep.append(lease)
+            self._idle[key] = keep
+
+        if pooled.leases == 0:
+            await pooled.browser.close()
+
+    async def _get_browser(self, headless: bool) -> _PooledBrowser:
+        pooled = self._browsers.get(headless)
+        if pooled and pooled.pages >= self.max_pages_per_browser:
+            await self._retire(pooled)
+            pooled = None
+        if pooled is None:
+            pooled = await self._launch(headless)
+        return pooled
+
+    async def acquire(self, headless: bool = True, user_agent: Optional[str] = None) -> PooledContext:
+        key = (headless, user_agent)
+        async with self._lock:
+            owner = await self._get_browser(headless)
+            idle = self._idle.get(key, [])
+            if idle:
+                lease = idle.pop()
+                self.stats["context_reuses"] += 1
+            else:
+                context = await owner.browser.new_context(user_agent=user_agent)
+                self.stats["contexts_created"] += 1
+                lease = PooledContext(self, owner, context, key)
+            owner.leases += 1
+            return lease
+
+    async def rotate(self, lease: PooledContext):
+        """
+        Moves `lease` to a new context on a fresh browser once its browser has served its pages.
+        """
+        async with self._lock:
+            owner = lease.owner
+            if owner.pages < self.max_pages_per_browser:
+                # Another tab of the lease rotated first
+                return
+            if not owner.retired:
+                await self._retire(owner)
+            fresh = await self._get_browser(owner.headless)
+            context = await fresh.browser.new_context(user_agent=lease.key[1])
+            self.stats["contexts_created"] += 1
+            fresh.leases += 1
+            lease._draining[lease.context] = owner
+            lease.owner, lease.context = fresh, context
+            await self._close_drained(lease)
+
+    async def close_drained(self, lease: PooledContext):
+        async with self._lock:
+            await self._close_drained(lease)
+
+    async def _close_drained(self, lease: PooledContext):
+        # Old contexts stay open until the tabs still loading on them are done
+        for context, owner in list(lease._draining.items()):
+            if lease._open.get(context, 0) > 0:
+                continue
+            del lease._draining[context]
+            lease._open.pop(context, None)
+            await context.close()
+            owner.leases -= 1
+            if owner.retired and owner.leases == 0:
+                await owner.browser.close()
+
+    async def release(self, lease: PooledContext):
+        async with self._lock:
+            lease._open.clear()
+            await self._close_drained(lease)
+            owner = lease.owner
+            owner.leases -= 1
+            idle = self._idle.setdefault(lease.key, [])
+
+            if owner.retired or len(idle) >= self.max_idle_contexts:
+                await lease.context.close()
+                if owner.retired and owner.leases == 0:
+                    await owner.browser.close()
+                return
+
+            idle.append(lease)
+
+    @asynccontextmanager
+    async def context(self, headless: bool = True, user_agent: Optional[str] = None):
+        lease = await self.acquire(headless=headless, user_agent=user_agent)
+        try:
+            yield lease
+        finally:
+            await self.release(lease)
+
+    async def close(self):
+        async with self._lock:
+            for idle in self._idle.values():
+                for lease in idle:
+                    await lease.context.close()
+            self._idle.clear()
+            for pooled in list(self._browsers.values()):
+                await pooled.browser.close()
+            self._browsers.clear()
+
+    def report(self) -> str:
+        return ", ".join(f"{name}={value}" for name, value in self.stats.items())
@@ -0,0 +1,131 @@
+"""
+HTML parser backends for result pages.
+
+parse_listing always receives BeautifulSoup elements, so every backend hands out
+the same card objects. They only differ in how the page is parsed:
+
+    "selectolax"   the page is parsed by Lexbor (C), cards and the next-page link are found
+                   there, and only the cards' own HTML is handed to BeautifulSoup
+    "lxml"         the whole page goes through BeautifulSoup with the lxml tree builder
+    "html.parser"  the whole page goes through BeautifulSoup's pure-Python parser
+
+"auto" picks the first one that is installed, in that order.
+"""
+
+from typing import List, Optional
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+
+def is_available(backend: str) -> bool:
+    if backend == "selectolax":
+        return LexborHTMLParser is not None
+    if backend == "lxml":
+        return lxml is not None
+    return backend == "html.parser"
+
+
+def resolve_backend(preferred: str = "auto") -> str:
+    """
+    The backend to use for `preferred`, falling back down BACKENDS when it isn't installed.
+    """
+    if preferred != "auto" and preferred not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser {preferred!r}, expected one of {('auto',) + BACKENDS}")
+    start = 0 if preferred == "auto" else BACKENDS.index(preferred)
+    for backend in BACKENDS[start:]:
+        if is_available(backend):
+            return backend
+    return "html.parser"
+
+
+def _soup_builder() -> str:
+    return "lxml" if lxml is not None else "html.parser"
+
+
+class SoupDocument:
+    """
+    A page parsed entirely by BeautifulSoup.
+    """
+
+    def __init__(self, content: str, builder: str = "html.parser"):
+        self.soup = BeautifulSoup(content, builder)
+
+    def select_cards(self, selectors: List[str]) -> list:
+        # Selectors are tried in order until one matches
+        for selector in selectors:
+            cards = self.soup.select(selector)
+            if cards:
+                return cards
+        return []
+
+    def select_href(self, selector: str) -> Optional[str]:
+        link = self.soup.select_one(selector)
+        return link.get("href") if link else None
+
+    def select_text(self, selector: str) -> Optional[str]:
+        element = self.soup.select_one(selector)
+        return element.get_text() if element else None
+
+    def find_script(self, marker: str) -> Optional[str]:
+        # First inline script whose source contains `marker`
+        for script in self.soup.find_all("script"):
+            text = script.get_text()
+            if marker in text:
+                return text
+        return None
+
+
+class LexborDocument:
+    """
+    A page parsed by selectolax; only the matched cards are rebuilt as BeautifulSoup elements.
+    """
+
+    def __init__(self, content: str):
+        self.tree = LexborHTMLParser(content)
+
+    def select_cards(self, selectors: List[str]) -> list:
+        for selector in selectors:
+            nodes = self.tree.css(selector)
+            if nodes:
+                # One BeautifulSoup pass over all cards instead of one per card
+                soup = BeautifulSoup("".join(node.html for node in nodes), _soup_builder())
+                root = soup.body or soup
+                return root.find_all(True, recursive=False)
+        return []
+
+    def select_href(self, selector: str) -> Optional[str]:
+        node = self.tree.css_first(selector)
+        return node.attributes.get("href") if node else None
+
+    def select_text(self, selector: str) -> Optional[str]:
+        node = self.tree.css_first(selector)
+        return node.text(deep=True) if node else None
+
+    def find_script(self, marker: str) -> Optional[str]:
+        for node in self.tree.css("script"):
+            text = node.text(deep=True)
+            if marker in text:
+                return text
+        return None
+
+
+def parse_html(content: str, backend: str = "html.parser"):
+    """
+    Parses a result page with an already resolved backend (see resolve_backend).
+    """
+    if backend == "selectolax":
+        return LexborDocument(content)
+    if backend == "lxml":
+        return SoupDocument(content, "lxml")
+    return SoupDocument(content, "html.parser")
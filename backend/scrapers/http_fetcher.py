@@ -0,0 +1,81 @@
+"""
+Direct HTTP fetching of server-rendered result pages, without a browser.
+"""
+
+import time
+from typing import Optional
+from .throttle import RetryableError
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401 - HTTP/2 support for httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pl-PL,pl;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+
+
+class HttpFetcher:
+    """
+    One pooled httpx client per scraper: keep-alive (HTTP/2 when the h2 package is installed),
+    a persistent cookie jar and compressed transfers.
+
+    Parallel "tabs" share the client, so close() is only called once the scraper is done.
+    """
+
+    def __init__(self, user_agent: Optional[str] = None, timeout: float = 30.0, max_connections: int = 10):
+        if httpx is None:
+            raise RuntimeError('"http" fetch mode needs the httpx package (pip install "httpx[http2]")')
+        headers = dict(DEFAULT_HEADERS)
+        if user_agent:
+            headers["User-Agent"] = user_agent
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            headers=headers,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self.stats = {"requests": 0, "bytes_downloaded": 0, "bytes_decoded": 0, "seconds": 0.0}
+
+    async def load(self, url: str) -> str:
+        """
+        GETs `url` and returns its HTML. Raises RetryableError on 429, 5xx, timeouts and dropped connections.
+        """
+        started = time.monotonic()
+        try:
+            response = await self.client.get(url)
+        except httpx.TimeoutException:
+            raise RetryableError("Timeout")
+        except httpx.TransportError as e:
+            raise RetryableError(f"Connection error: {e}")
+
+        self.stats["requests"] += 1
+        self.stats["bytes_downloaded"] += response.num_bytes_downloaded
+        self.stats["bytes_decoded"] += len(response.content)
+        self.stats["seconds"] += time.monotonic() - started
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableError(f"HTTP {response.status_code}", response.status_code)
+        return response.text
+
+    def report(self) -> str:
+        requests = self.stats["requests"]
+        avg = self.stats["seconds"] / requests if requests else 0.0
+        return (f"http2={HTTP2_AVAILABLE}, requests={requests}, avg_request={avg:.2f}s, "
+                f"downloaded_kb={self.stats['bytes_downloaded'] // 1024}, html_kb={self.stats['bytes_decoded'] // 1024}")
+
+    async def close(self):
+        # Tabs share the client, see the class docstring
+        pass
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -0,0 +1,313 @@
+"""
+Shared, precompiled parsing helpers for the scrapers' parse_listing methods.
+
+Everything here is built once at import time: regexes, CSS selectors and the
+combined brand pattern, so parsing a card does no pattern compilation and no
+repeated lower-casing. The scrapers' card selectors are all simple (tag, class,
+attribute and descendant), and SimpleSelector matches those directly on the bs4
+tree, several times faster than soupsieve's general matcher.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple, Iterable
+import soupsieve
+from bs4 import Tag
+
+BRANDS = [
+    "Audi", "BMW", "Mercedes", "Volkswagen", "VW", "Opel", "Ford", "Toyota",
+    "Nissan", "Honda", "Mazda", "Renault", "Peugeot", "Citroën", "Fiat",
+    "Skoda", "Seat", "Kia", "Hyundai", "Volvo", "Lexus", "Porsche", "Dacia",
+    "Suzuki", "Mitsubishi", "Subaru", "Jeep", "Land Rover", "Mini", "Alfa Romeo",
+]
+
+FUEL_TYPES = {
+    "benzyna": "Benzyna",
+    "diesel": "Diesel",
+    "hybryda": "Hybryda",
+    "elektryczny": "Elektryczny",
+    "lpg": "LPG",
+    "cng": "CNG",
+}
+
+BODY_TYPES = ["Sedan", "Kombi", "SUV", "Hatchback", "Coupe", "Kabriolet", "Minivan", "Pickup"]
+
+COLORS = [
+    "Biały", "Czarny", "Srebrny", "Szary", "Niebieski", "Czerwony", "Zielony",
+    "Żółty", "Brązowy", "Beżowy", "Złoty", "Pomarańczowy",
+]
+
+DAMAGED_KEYWORDS = ("uszkodzony", "uszkodzone", "po wypadku")
+NEW_KEYWORDS = ("nowy", "nowe")
+
+MAX_YEAR = datetime.now().year + 1
+
+# Lower-cased lookups, built once instead of calling .lower() per card and per candidate
+_BODY_TYPES_LOWER = [(body.lower(), body) for body in BODY_TYPES]
+_COLORS_LOWER = [(color.lower(), color) for color in COLORS]
+_BRANDS_BY_LOWER = {brand.lower(): brand for brand in BRANDS}
+
+# One alternation for every brand, longest first so "Land Rover" wins over shorter prefixes,
+# with the model (word after the brand) captured in the same pass
+BRAND_MODEL_RE = re.compile(
+    r"\b(" + "|".join(re.escape(brand) for brand in sorted(BRANDS, key=len, reverse=True)) + r")"
+    r"(?:\s+([A-Za-z0-9\-]+))?",
+    re.IGNORECASE,
+)
+
+# Numbers are either plain digits or thousands groups ("150 000"), never glued to a preceding number,
+# so "2018 150 000 km" reads as 150000 km. "km" is mileage and "KM" is horsepower, hence case-sensitive.
+_NUMBER = r"(?<!\d)(\d{1,3}(?:[ \u00a0]\d{3})+|\d+)"
+YEAR_RE = re.compile(r"\b(19\d{2}|20\d{2})\b")
+MILEAGE_RE = re.compile(_NUMBER + r"\s*km\b")
+CAPACITY_RE = re.compile(_NUMBER + r"\s*cm3", re.IGNORECASE)
+POWER_RE = re.compile(r"(?<!\d)(\d+)\s*KM\b")
+WHITESPACE_RE = re.compile(r"\s")
+NON_DIGIT_RE = re.compile(r"[^\d]")
+NON_DIGIT_COMMA_RE = re.compile(r"[^\d,]")
+
+
+# One compound selector, e.g. a.offer-link or p[data-testid='location'] or [href*='/oferta/']
+_COMPOUND_RE = re.compile(
+    r"([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)((?:\[[\w-]+(?:[*^$]?=(?:'[^']*'|\"[^\"]*\"))?\])*)"
+)
+_ATTRIBUTE_RE = re.compile(r"\[([\w-]+)(?:([*^$]?=)(?:'([^']*)'|\"([^\"]*)\"))?\]")
+
+
+class SimpleSelector:
+    """
+    Selector lists of compound selectors joined by descendant combinators, matched by
+    walking the card once. Same results as soupsieve for that subset: the first match in
+    document order, with ancestors looked up through the whole document.
+    """
+
+    __slots__ = ("alternatives",)
+
+    def __init__(self, alternatives):
+        # [[(tag name or None, classes, [(attribute, operator or None, value)]), ...], ...]
+        self.alternatives = alternatives
+
+    @classmethod
+    def compile(cls, css: str) -> Optional["SimpleSelector"]:
+        """
+        The selector for `css`, or None when it uses anything beyond the simple subset.
+        """
+        alternatives = []
+        for alternative in css.split(","):
+            chain = []
+            for part in alternative.split():
+                match = _COMPOUND_RE.fullmatch(part)
+                if not match:
+                    return None
+                name, classes, attributes = match.groups()
+                chain.append((
+                    name.lower() if name else None,
+                    tuple(c for c in classes.split(".") if c),
+                    tuple((attribute, operator or None, single if single is not None else double)
+                          for attribute, operator, single, double in _ATTRIBUTE_RE.findall(attributes)),
+                ))
+            if not chain:
+                return None
+            alternatives.append(tuple(chain))
+        return cls(tuple(alternatives))
+
+    def select_one(self, element):
+        for node in element.descendants:
+            if isinstance(node, Tag):
+                for chain in self.alternatives:
+                    if _matches_chain(node, chain):
+                        return node
+        return None
+
+
+def _matches(tag, compound) -> bool:
+    name, classes, attributes = compound
+    if name is not None and tag.name != name:
+        return False
+    if classes:
+        present = tag.get("class")
+        if not present or any(c not in present for c in classes):
+            return False
+    for attribute, operator, expected in attributes:
+        value = tag.get(attribute)
+        if value is None:
+            return False
+        if operator is None:
+            continue
+        if isinstance(value, list):
+            value = " ".join(value)
+        if operator == "=":
+            if value != expected:
+                return False
+        elif operator == "*=":
+            if expected not in value:
+                return False
+        elif operator == "^=":
+            if not value.startswith(expected):
+                return False
+        elif not value.endswith(expected):
+            return False
+    return True
+
+
+def _matches_chain(tag, chain) -> bool:
+    if not _matches(tag, chain[-1]):
+        return False
+    # Ancestors, nearest first, must match the remaining compounds right to left
+    remaining = len(chain) - 2
+    node = tag.parent
+    while remaining >= 0 and node is not None:
+        if _matches(node, chain[remaining]):
+            remaining -= 1
+        node = node.parent
+    return remaining < 0
+
+
+@lru_cache(maxsize=None)
+def selector(css: str):
+    """
+    Compiled CSS selector, shared by every card: a SimpleSelector when the syntax
+    allows, soupsieve otherwise.
+    """
+    return SimpleSelector.compile(css) or soupsieve.compile(css)
+
+
+def select_one(element, css: str):
+    return selector(css).select_one(element)
+
+
+def first_text(element, *selectors: str) -> Optional[str]:
+    """
+    Stripped text of the first selector that matches, like `get_text(a) or get_text(b)`.
+    """
+    for css in selectors:
+        el = selector(css).select_one(element)
+        if el:
+            text = el.get_text(strip=True)
+            if text:
+                return text
+    return None
+
+
+class CardText:
+    """
+    A card's text with its lower-case form computed at most once.
+    """
+
+    __slots__ = ("text", "_lower")
+
+    def __init__(self, text: Optional[str]):
+        self.text = text or ""
+        self._lower = None
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+
+def _int(raw: str) -> int:
+    return int(WHITESPACE_RE.sub("", raw))
+
+
+def to_int(value) -> Optional[int]:
+    """
+    int from a JSON value that may be a number or a string like "150 000".
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return int(float(WHITESPACE_RE.sub("", str(value)).replace(",", ".")))
+    except ValueError:
+        return None
+
+
+def to_float(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(WHITESPACE_RE.sub("", str(value)).replace(",", "."))
+    except ValueError:
+        return None
+
+
+def parse_price(raw: Optional[str], decimal_comma: bool = False) -> Tuple[Optional[float], str]:
+    """
+    Returns (price, currency) from a price label such as "45 900 zł" or "12 500 EUR".
+    """
+    if not raw:
+        return None, "PLN"
+    pattern = NON_DIGIT_COMMA_RE if decimal_comma else NON_DIGIT_RE
+    price = None
+    try:
+        price = float(pattern.sub("", raw).replace(",", "."))
+    except ValueError:
+        pass
+    currency = "EUR" if "EUR" in raw or "€" in raw else "PLN"
+    return price, currency
+
+
+def parse_year(text: str) -> Optional[int]:
+    match = YEAR_RE.search(text)
+    if match:
+        year = int(match.group(1))
+        if 1900 < year <= MAX_YEAR:
+            return year
+    return None
+
+
+def parse_mileage(text: str) -> Optional[int]:
+    match = MILEAGE_RE.search(text)
+    return _int(match.group(1)) if match else None
+
+
+def parse_engine_capacity(text: str) -> Optional[float]:
+    match = CAPACITY_RE.search(text)
+    return float(WHITESPACE_RE.sub("", match.group(1))) if match else None
+
+
+def parse_power(text: str) -> Optional[int]:
+    match = POWER_RE.search(text)
+    return int(match.group(1)) if match else None
+
+
+def _first_keyword(lower: str, candidates: Iterable[Tuple[str, str]]) -> Optional[str]:
+    for keyword, label in candidates:
+        if keyword in lower:
+            return label
+    return None
+
+
+def find_fuel_type(text: CardText) -> Optional[str]:
+    return _first_keyword(text.lower, FUEL_TYPES.items())
+
+
+def find_body_type(text: CardText) -> Optional[str]:
+    return _first_keyword(text.lower, _BODY_TYPES_LOWER)
+
+
+def find_color(text: CardText) -> Optional[str]:
+    return _first_keyword(text.lower, _COLORS_LOWER)
+
+
+def detect_condition(text: CardText) -> str:
+    lower = text.lower
+    if any(keyword in lower for keyword in DAMAGED_KEYWORDS):
+        return "damaged"
+    if any(keyword in lower for keyword in NEW_KEYWORDS):
+        return "new"
+    return "used"
+
+
+def match_brand_model(title: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Finds the first known brand in `title` and the word following it, in one regex pass.
+    """
+    if not title:
+        return None, None
+    match = BRAND_MODEL_RE.search(title)
+    if not match:
+        return None, None
+    return _BRANDS_BY_LOWER[match.group(1).lower()], match.group(2)
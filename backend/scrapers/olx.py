@@ -1,79 +1,101 @@
-import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from playwright.async_api import Page
-from bs4 import BeautifulSoup
 from .base import BaseScraper
+from .normalize import (
+    CardText, select_one, first_text, parse_price, parse_year, parse_mileage, parse_engine_capacity,
+    find_fuel_type, match_brand_model, to_int, to_float
+)
+import json
 import re
 from datetime import datetime
 
+AD_ID_RE = re.compile(r'-ID([A-Za-z0-9]+)\.html')
+DATE_POSTED_RE = re.compile(r'(dziś|wczoraj|.*\d{2}:\d{2})', re.IGNORECASE)
+
+# window.__PRERENDERED_STATE__= "<the state, JSON-encoded as a string>";
+PRERENDERED_STATE_MARKER = "__PRERENDERED_STATE__"
+PRERENDERED_STATE_RE = re.compile(r'__PRERENDERED_STATE__\s*=\s*("(?:[^"\\]|\\.)*")')
+
+
+def source_id_from_url(source_url: str) -> str:
+    id_match = AD_ID_RE.search(source_url)
+    if id_match:
+        return id_match.group(1)
+    return source_url.split("/")[-1].replace(".html", "")
+
+
 class OLXScraper(BaseScraper):
-    def __init__(self):
-        super().__init__("olx")
-
-    async def scrape(self, playwright, search_url: str, limit_pages: int = 1) -> List[Dict[str, Any]]:
-        results = []
-        browser = await playwright.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        page = await context.new_page()
-
-        current_url = search_url
-        for page_num in range(limit_pages):
-            print(f"[OLX] Scraping page {page_num + 1}: {current_url}")
-            try:
-                await page.goto(current_url, timeout=60000)
-                await page.wait_for_load_state("networkidle")
-                
-                # Handle cookie consent if present
-                try:
-                    await page.click("button[data-cy='ad-consent-accept']", timeout=3000)
-                except:
-                    pass
-
-                content = await page.content()
-                soup = BeautifulSoup(content, "html.parser")
-                
-                # OLX uses div[data-cy="l-card"] for listing cards
-                listings = soup.select("div[data-cy='l-card']")
-                
-                if not listings:
-                    # Fallback to alternative selector
-                    listings = soup.select("div.css-1sw7q4x")
-                
-                print(f"[OLX] Found {len(listings)} listings on page {page_num + 1}")
-                
-                for listing in listings:
-                    try:
-                        data = self.parse_listing(listing)
-                        if data:
-                            results.append(data)
-                    except Exception as e:
-                        print(f"[OLX] Error parsing listing: {e}")
-
-                # Find next page
-                next_button = soup.select_one("a[data-cy='pagination-forward']")
-                if next_button and next_button.get("href"):
-                    current_url = "https://www.olx.pl" + next_button["href"]
-                else:
-                    break
-                    
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                print(f"[OLX] Error scraping page {current_url}: {e}")
-                break
-        
-        await browser.close()
-        return results
+    headless = True
+    user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    log_prefix = "[OLX] "
+    # OLX uses div[data-cy="l-card"] for listing cards, with a class-based fallback
+    listing_selectors = ["div[data-cy='l-card']", "div.css-1sw7q4x"]
+    next_page_selector = "a[data-cy='pagination-forward']"
+    cookie_selector = "button[data-cy='ad-consent-accept']"
+    page_param = "page"
+    newest_first_params = {"search[order]": "created_at:desc"}
+
+    def __init__(self, rate_limiter=None):
+        super().__init__("olx", rate_limiter)
+
+    def parse_embedded(self, document) -> Optional[List[Dict[str, Any]]]:
+        script = document.find_script(PRERENDERED_STATE_MARKER)
+        if not script:
+            return None
+        match = PRERENDERED_STATE_RE.search(script)
+        if not match:
+            return None
+        state = json.loads(json.loads(match.group(1)))
+        ads = state.get("listing", {}).get("listing", {}).get("ads")
+        if not isinstance(ads, list):
+            return None
 
-    def parse_listing(self, soup_element) -> Dict[str, Any]:
-        def get_text(selector):
-            el = soup_element.select_one(selector)
-            return el.get_text(strip=True) if el else None
+        listings = []
+        for ad in ads:
+            data = self.parse_ad(ad)
+            if data:
+                listings.append(data)
+        return listings
+
+    def parse_ad(self, ad: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Maps one ad from the prerendered state to the same fields parse_listing produces.
+        """
+        source_url = ad.get("url")
+        if not source_url:
+            return None
+        if not source_url.startswith("http"):
+            source_url = "https://www.olx.pl" + source_url
+
+        # params: [{"key": "year", "value": "2018", "normalizedValue": "2018"}, ...]
+        values = {}
+        for param in ad.get("params") or []:
+            values[param.get("key")] = param.get("normalizedValue") or param.get("value")
+        labels = {param.get("key"): param.get("value") for param in ad.get("params") or []}
 
+        title = ad.get("title")
+        brand, model = match_brand_model(title)
+        price = (ad.get("price") or {}).get("regularPrice") or {}
+
+        return {
+            "source_id": source_id_from_url(source_url),
+            "source_url": source_url,
+            "platform": "olx",
+            "brand": brand,
+            "model": model or title,
+            "price": to_float(price.get("value")),
+            "currency": price.get("currencyCode") or "PLN",
+            "production_year": to_int(values.get("year")),
+            "mileage": to_int(values.get("milage")),  # sic, OLX spells the key this way
+            "fuel_type": find_fuel_type(CardText(labels.get("petrol"))),
+            "engine_capacity": to_float(values.get("enginesize")),
+            "location": (ad.get("location") or {}).get("cityName"),
+            "created_at_source": ad.get("createdTime")
+        }
+
+    def parse_listing(self, soup_element) -> Dict[str, Any]:
         # Link and ID
-        link_tag = soup_element.select_one("a[data-cy='listing-ad-title']") or soup_element.select_one("a.css-rc5s2u")
+        link_tag = select_one(soup_element, "a[data-cy='listing-ad-title']") or select_one(soup_element, "a.css-rc5s2u")
         if not link_tag:
             return None
         
@@ -82,105 +104,28 @@ class OLXScraper(BaseScraper):
             source_url = "https://www.olx.pl" + source_url
             
         # Extract ID from URL
-        source_id = None
-        id_match = re.search(r'-ID([A-Za-z0-9]+)\.html', source_url)
-        if id_match:
-            source_id = id_match.group(1)
-        else:
-            source_id = source_url.split("/")[-1].replace(".html", "")
+        source_id = source_id_from_url(source_url)
 
         # Title
-        title = get_text("a[data-cy='listing-ad-title']") or get_text("h6")
+        title = first_text(soup_element, "a[data-cy='listing-ad-title']", "h6")
         
         # Price
-        price_raw = get_text("p[data-testid='ad-price']") or get_text("p.css-10b0gli")
-        price = None
-        currency = "PLN"
-        if price_raw:
-            # Remove spaces and "zł"
-            price_clean = re.sub(r"[^\d]", "", price_raw)
-            try:
-                price = float(price_clean)
-            except:
-                pass
-            if "€" in price_raw or "EUR" in price_raw:
-                currency = "EUR"
+        price, currency = parse_price(first_text(soup_element, "p[data-testid='ad-price']", "p.css-10b0gli"))
 
         # Location
-        location = get_text("p[data-testid='location-date']") or get_text("p.css-1a4brun")
+        location = first_text(soup_element, "p[data-testid='location-date']", "p.css-1a4brun")
         
         # Date posted
         date_posted = None
         if location:
             # OLX shows location and date together, e.g., "Warszawa - Dziś 12:30"
-            date_match = re.search(r'(dziś|wczoraj|.*\d{2}:\d{2})', location, re.IGNORECASE)
+            date_match = DATE_POSTED_RE.search(location)
             if date_match:
                 date_posted = date_match.group(1)
         
-        # Extract details from title/description
-        details_text = title or ""
-        
-        # Parse year
-        production_year = None
-        year_match = re.search(r'\b(19\d{2}|20\d{2})\b', details_text)
-        if year_match:
-            try:
-                parsed_year = int(year_match.group(1))
-                if 1900 < parsed_year <= 2026:
-                    production_year = parsed_year
-            except:
-                pass
-
-        # Parse mileage
-        mileage = None
-        mileage_match = re.search(r'(\d[\d\s]*)\s*km', details_text, re.IGNORECASE)
-        if mileage_match:
-            try:
-                mileage = int(re.sub(r'\s', '', mileage_match.group(1)))
-            except:
-                pass
-
-        # Parse fuel type
-        fuel_type = None
-        fuel_keywords = {
-            "benzyna": "Benzyna",
-            "diesel": "Diesel",
-            "hybryda": "Hybryda",
-            "elektryczny": "Elektryczny",
-            "lpg": "LPG",
-            "cng": "CNG"
-        }
-        details_lower = details_text.lower()
-        for keyword, fuel_name in fuel_keywords.items():
-            if keyword in details_lower:
-                fuel_type = fuel_name
-                break
-
-        # Parse engine capacity
-        engine_capacity = None
-        capacity_match = re.search(r'(\d[\d\s]*)\s*cm3', details_text, re.IGNORECASE)
-        if capacity_match:
-            try:
-                engine_capacity = float(re.sub(r'\s', '', capacity_match.group(1)))
-            except:
-                pass
-
-        # Parse brand and model from title
-        brand = None
-        model = None
-        # Common Polish car brands
-        brands = ["Audi", "BMW", "Mercedes", "Volkswagen", "VW", "Opel", "Ford", "Toyota", 
-                  "Nissan", "Honda", "Mazda", "Renault", "Peugeot", "Citroën", "Fiat", 
-                  "Skoda", "Seat", "Kia", "Hyundai", "Volvo", "Lexus", "Porsche"]
-        
-        for brand_name in brands:
-            if brand_name.lower() in details_text.lower():
-                brand = brand_name
-                # Try to extract model (word after brand)
-                model_match = re.search(rf'{brand_name}\s+([A-Za-z0-9\-]+)', details_text, re.IGNORECASE)
-                if model_match:
-                    model = model_match.group(1)
-                break
+        # Extract details from title
+        details = CardText(title)
+        brand, model = match_brand_model(details.text)
 
         return {
             "source_id": source_id,
@@ -190,12 +135,10 @@ class OLXScraper(BaseScraper):
             "model": model or title,
             "price": price,
             "currency": currency,
-            "production_year": production_year,
-            "mileage": mileage,
-            "fuel_type": fuel_type,
-            "engine_capacity": engine_capacity,
+            "production_year": parse_year(details.text),
+            "mileage": parse_mileage(details.text),
+            "fuel_type": find_fuel_type(details),
+            "engine_capacity": parse_engine_capacity(details.text),
             "location": location,
             "created_at_source": date_posted
         }
-
-
@@ -1,201 +1,137 @@
-import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from playwright.async_api import Page
-from bs4 import BeautifulSoup
 from .base import BaseScraper
-import re
+from .normalize import (
+    CardText, select_one, first_text, parse_price, parse_year, parse_mileage, parse_engine_capacity,
+    parse_power, find_fuel_type, find_body_type, find_color, detect_condition, match_brand_model,
+    to_int, to_float
+)
+import json
+
+
+def source_id_from_url(source_url: str) -> str:
+    # ".../bmw-seria-3-ID6GqX9a.html" -> "ID6GqX9a"
+    return source_url.split("-")[-1].split(".")[0] if "-" in source_url else source_url
+
+
+def _advert_edges(next_data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    The search results in __NEXT_DATA__: pageProps.urqlState holds the GraphQL responses,
+    each as a JSON string, and one of them is the advertSearch query.
+    """
+    page_props = next_data.get("props", {}).get("pageProps", {})
+    responses = [page_props]
+    for entry in (page_props.get("urqlState") or {}).values():
+        data = entry.get("data") if isinstance(entry, dict) else None
+        if isinstance(data, str):
+            data = json.loads(data)
+        if isinstance(data, dict):
+            responses.append(data)
+    for response in responses:
+        search = response.get("advertSearch")
+        if isinstance(search, dict) and isinstance(search.get("edges"), list):
+            return search["edges"]
+    return None
+
 
 class OtomotoScraper(BaseScraper):
-    def __init__(self):
-        super().__init__("otomoto")
-
-    async def scrape(self, playwright, search_url: str, limit_pages: int = 1) -> List[Dict[str, Any]]:
-        results = []
-        browser = await playwright.chromium.launch(headless=False) # Headless=False to avoid some detections
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        page = await context.new_page()
-
-        current_url = search_url
-        for page_num in range(limit_pages):
-            print(f"Scraping page {page_num + 1}: {current_url}")
-            try:
-                await page.goto(current_url, timeout=60000)
-                await page.wait_for_load_state("networkidle")
-                
-                # Handle cookie banner if present
-                try:
-                    await page.click("#onetrust-accept-btn-handler", timeout=5000)
-                except:
-                    pass
-
-                content = await page.content()
-                soup = BeautifulSoup(content, "html.parser")
-                
-                # Select articles
-                articles = soup.select("article[data-testid='listing-ad']")
-                
-                for article in articles:
-                    try:
-                        data = self.parse_listing(article)
-                        if data:
-                            results.append(data)
-                    except Exception as e:
-                        print(f"Error parsing listing: {e}")
-
-                # Find next page
-                next_page_tag = soup.select_one("li[title='Next Page'] a")
-                if next_page_tag and next_page_tag.get("href"):
-                    current_url = next_page_tag["href"]
-                else:
-                    break
-                    
-                # Small delay
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                print(f"Error scraping page {current_url}: {e}")
-                break
-        
-        await browser.close()
-        return results
+    headless = False  # Headless=False to avoid some detections
+    user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    log_prefix = "[Otomoto] "
+    listing_selectors = ["article[data-testid='listing-ad']"]
+    next_page_selector = "li[title='Next Page'] a"
+    cookie_selector = "#onetrust-accept-btn-handler"
+    cookie_timeout = 5000
+    page_param = "page"
+    newest_first_params = {"search[order]": "created_at_first:desc"}
+
+    def __init__(self, rate_limiter=None):
+        super().__init__("otomoto", rate_limiter)
+
+    def parse_embedded(self, document) -> Optional[List[Dict[str, Any]]]:
+        raw = document.select_text("script#__NEXT_DATA__")
+        if not raw:
+            return None
+        edges = _advert_edges(json.loads(raw))
+        if edges is None:
+            return None
 
-    def parse_listing(self, soup_element) -> Dict[str, Any]:
-        # Helper to extract text
-        def get_text(selector):
-            el = soup_element.select_one(selector)
-            return el.get_text(strip=True) if el else None
+        listings = []
+        for edge in edges:
+            data = self.parse_advert(edge.get("node") or {})
+            if data:
+                listings.append(data)
+        return listings
+
+    def parse_advert(self, advert: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Maps one advertSearch node to the same fields parse_listing produces.
+        """
+        source_url = advert.get("url")
+        if not source_url:
+            return None
+
+        # parameters: [{"key": "year", "value": "2018", "displayValue": "2018"}, ...]
+        values = {}
+        labels = {}
+        for parameter in advert.get("parameters") or []:
+            values[parameter.get("key")] = parameter.get("value")
+            labels[parameter.get("key")] = parameter.get("displayValue") or parameter.get("value")
+
+        title = advert.get("title")
+        # otomoto's own labels ("Mercedes-Benz", "Seria 3") go through the shared brand table,
+        # so embedded, card and other platforms' listings group and dedupe on the same values
+        brand, model = match_brand_model(" ".join(filter(None, (labels.get("make"), labels.get("model")))))
+        if not brand:
+            brand, model = match_brand_model(title)
+
+        amount = (advert.get("price") or {}).get("amount") or {}
+        condition = "new" if values.get("new_used") == "new" else "used"
+        if str(values.get("damaged")) in ("1", "true", "True"):
+            condition = "damaged"
+        city = ((advert.get("location") or {}).get("city") or {}).get("name")
 
+        return {
+            "source_id": source_id_from_url(source_url),
+            "source_url": source_url,
+            "platform": "otomoto",
+            "brand": brand,
+            "model": model or title,
+            "price": to_float(amount.get("units")),
+            "currency": amount.get("currencyCode") or "PLN",
+            "production_year": to_int(values.get("year")),
+            "mileage": to_int(values.get("mileage")),
+            "fuel_type": find_fuel_type(CardText(labels.get("fuel_type"))),
+            "engine_capacity": to_float(values.get("engine_capacity")),
+            "power": to_int(values.get("engine_power")),
+            "body_type": find_body_type(CardText(labels.get("body_type"))),
+            "color": find_color(CardText(labels.get("color"))),
+            "condition": condition,
+            "location": city,
+            "created_at_source": advert.get("createdAt")
+        }
+
+    def parse_listing(self, soup_element) -> Dict[str, Any]:
         # Link and ID
-        link_tag = soup_element.select_one("h1 a") or soup_element.select_one("h2 a")
+        link_tag = select_one(soup_element, "h1 a") or select_one(soup_element, "h2 a")
         if not link_tag:
             return None
         
         source_url = link_tag.get("href")
-        source_id = source_url.split("-")[-1].split(".")[0] if "-" in source_url else source_url
+        source_id = source_id_from_url(source_url)
 
         # Basic Info
-        title = get_text("h1 a") or get_text("h2 a")
+        title = link_tag.get_text(strip=True) or None
         
         # Price
-        price_raw = get_text("h3") or get_text("div[data-testid='ad-price']") 
-        price = None
-        currency = "PLN"
-        if price_raw:
-            price_clean = re.sub(r"[^\d,]", "", price_raw).replace(",", ".")
-            try:
-                price = float(price_clean)
-            except:
-                pass
-            if "EUR" in price_raw:
-                currency = "EUR"
+        price_raw = first_text(soup_element, "h3", "div[data-testid='ad-price']")
+        price, currency = parse_price(price_raw, decimal_comma=True)
 
         # Parameters (Year, Mileage, Capacity, Fuel) typically in a list or specific divs
-        # This part is tricky as Otomoto changes often. We'll look for specific patterns.
-        # Often it is a dl/dd or div list.
-        # Strategy: Iterate over all text nodes that look like parameters.
-        
-        details_text = soup_element.get_text(" | ", strip=True)
-        
-        # Heuristics for parsing details from the text blob if selectors fail
-        production_year = None
-        mileage = None
-        fuel_type = None
-        engine_capacity = None
-        power = None
-        brand = None
-        model = None
-        body_type = None
-        color = None
-        condition = None
-        location = None
-        created_at_source = None
-        
-        # Example: "2018 | 150 000 km | 1 998 cm3 | Benzyna"
-        # We can try to parse known patterns.
-        
-        # Re-parse simple params usually found in specific divs if possible
-        # Currently Otomoto uses specific testids for params basically.
-        
-        # Fallback regex
-        year_match = re.search(r"(\d{4})", details_text)
-        if year_match:
-            try:
-                parsed_year = int(year_match.group(1))
-                if 1900 < parsed_year < 2026:
-                    production_year = parsed_year
-            except: pass
-
-        mileage_match = re.search(r"(\d[\d\s]*)\s*km", details_text, re.IGNORECASE)
-        if mileage_match:
-             mileage = int(re.sub(r"\s", "", mileage_match.group(1)))
-
-        capacity_match = re.search(r"(\d[\d\s]*)\s*cm3", details_text, re.IGNORECASE)
-        if capacity_match:
-             engine_capacity = float(re.sub(r"\s", "", capacity_match.group(1)))
-             
-        # Power
-        power_match = re.search(r"(\d+)\s*KM", details_text, re.IGNORECASE)
-        if power_match:
-            try:
-                power = int(power_match.group(1))
-            except:
-                pass
-             
-        # Fuel
-        for fuel in ["Benzyna", "Diesel", "Hybryda", "Elektryczny", "LPG", "CNG"]:
-            if fuel in details_text:
-                fuel_type = fuel
-                break
-
-        # Brand and Model parsing from title
-        brands = ["Audi", "BMW", "Mercedes", "Volkswagen", "VW", "Opel", "Ford", "Toyota", 
-                  "Nissan", "Honda", "Mazda", "Renault", "Peugeot", "Citroën", "Fiat", 
-                  "Skoda", "Seat", "Kia", "Hyundai", "Volvo", "Lexus", "Porsche", "Dacia",
-                  "Suzuki", "Mitsubishi", "Subaru", "Jeep", "Land Rover", "Mini", "Alfa Romeo"]
-        
-        if title:
-            for brand_name in brands:
-                if brand_name.lower() in title.lower():
-                    brand = brand_name
-                    # Extract model (word after brand)
-                    model_match = re.search(rf'{brand_name}\s+([A-Za-z0-9\-]+)', title, re.IGNORECASE)
-                    if model_match:
-                        model = model_match.group(1)
-                    break
-
-        # Body type
-        body_types = ["Sedan", "Kombi", "SUV", "Hatchback", "Coupe", "Kabriolet", "Minivan", "Pickup"]
-        for body in body_types:
-            if body.lower() in details_text.lower():
-                body_type = body
-                break
-
-        # Color
-        colors = ["Biały", "Czarny", "Srebrny", "Szary", "Niebieski", "Czerwony", "Zielony", 
-                  "Żółty", "Brązowy", "Beżowy", "Złoty", "Pomarańczowy"]
-        for col in colors:
-            if col.lower() in details_text.lower():
-                color = col
-                break
-
-        # Condition
-        details_lower = details_text.lower()
-        if "uszkodzony" in details_lower or "uszkodzone" in details_lower or "po wypadku" in details_lower:
-            condition = "damaged"
-        elif "nowy" in details_lower or "nowe" in details_lower:
-            condition = "new"
-        else:
-            condition = "used"
-
-        # Location (often in a specific element)
-        location = get_text("p[data-testid='location']") or get_text(".location")
-
-        # Date posted
-        date_elem = get_text("p[data-testid='date']") or get_text(".date")
-        if date_elem:
-            created_at_source = date_elem
+        # This part is tricky as Otomoto changes often, so we parse known patterns
+        # from the card's text, e.g. "2018 | 150 000 km | 1 998 cm3 | Benzyna"
+        details = CardText(soup_element.get_text(" | ", strip=True))
+        brand, model = match_brand_model(title)
 
         return {
             "source_id": source_id,
@@ -205,16 +141,14 @@ class OtomotoScraper(BaseScraper):
             "model": model or title,
             "price": price,
             "currency": currency,
-            "production_year": production_year,
-            "mileage": mileage,
-            "fuel_type": fuel_type,
-            "engine_capacity": engine_capacity,
-            "power": power,
-            "body_type": body_type,
-            "color": color,
-            "condition": condition,
-            "location": location,
-            "created_at_source": created_at_source
+            "production_year": parse_year(details.text),
+            "mileage": parse_mileage(details.text),
+            "fuel_type": find_fuel_type(details),
+            "engine_capacity": parse_engine_capacity(details.text),
+            "power": parse_power(details.text),
+            "body_type": find_body_type(details),
+            "color": find_color(details),
+            "condition": detect_condition(details),
+            "location": first_text(soup_element, "p[data-testid='location']", ".location"),
+            "created_at_source": first_text(soup_element, "p[data-testid='date']", ".date")
         }
-
-
@@ -0,0 +1,139 @@
+"""
+On-disk cache of fetched result pages, so parsers can be re-run without the network.
+
+Layout of a cache directory:
+    index.jsonl                      one line per fetch: url, platform, fetched_at, sha256, bytes
+    objects/<ab>/<sha256>.html.gz    page HTML, gzip-compressed, stored once per distinct content
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+
+class PageCache:
+    """
+    Content-addressed page store with TTL and size-based eviction.
+
+    `put()` only appends to the index and writes an object when its content is
+    new; `evict()` drops expired fetches, then the oldest ones until the objects
+    fit in `max_bytes`.
+    """
+
+    def __init__(self, root: str, ttl_days: int = DEFAULT_TTL_DAYS, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.ttl = timedelta(days=ttl_days)
+        self.max_bytes = max_bytes
+        self.stats = {"stored": 0, "deduplicated": 0, "bytes_written": 0}
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / 'index.jsonl'
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / 'objects' / digest[:2] / f"{digest}.html.gz"
+
+    def put(self, platform: str, url: str, content: str):
+        raw = content.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(digest)
+        if path.exists():
+            self.stats["deduplicated"] += 1
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = gzip.compress(raw, compresslevel=6, mtime=0)
+            tmp = path.with_suffix('.tmp')
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self.stats["stored"] += 1
+            self.stats["bytes_written"] += len(data)
+
+        entry = {
+            'url': url,
+            'platform': platform,
+            'fetched_at': datetime.now().isoformat(),
+            'sha256': digest,
+            'bytes': path.stat().st_size,
+        }
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def load_index(self) -> List[Dict[str, Any]]:
+        if not self.index_path.exists():
+            return []
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def read(self, digest: str) -> str:
+        return gzip.decompress(self._object_path(digest).read_bytes()).decode('utf-8')
+
+    def iter_pages(self, platform: Optional[str] = None, since: Optional[str] = None,
+                   until: Optional[str] = None) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """
+        Yields (index entry, HTML) for cached fetches in fetch order.
+        `since`/`until` are ISO dates or timestamps compared against fetched_at.
+        """
+        for entry in self.load_index():
+            if platform and entry['platform'] != platform:
+                continue
+            if since and entry['fetched_at'] < since:
+                continue
+            if until and entry['fetched_at'] >= until:
+                continue
+            try:
+                yield entry, self.read(entry['sha256'])
+            except FileNotFoundError:
+                continue
+
+    def evict(self) -> Tuple[int, int]:
+        """
+        Applies the TTL and size limit. Returns (fetches dropped, objects deleted).
+        """
+        entries = self.load_index()
+        if not entries:
+            return 0, 0
+
+        cutoff = (datetime.now() - self.ttl).isoformat()
+        kept = [entry for entry in entries if entry['fetched_at'] >= cutoff]
+
+        # Newest fetches win: walk back from the end until the size budget is used up
+        sizes = {}
+        budget = self.max_bytes
+        newest_first = []
+        for entry in reversed(kept):
+            digest = entry['sha256']
+            if digest not in sizes:
+                if entry['bytes'] > budget:
+                    break
+                budget -= entry['bytes']
+                sizes[digest] = entry['bytes']
+            newest_first.append(entry)
+        kept = newest_first[::-1]
+
+        deleted = 0
+        stale = {entry['sha256'] for entry in entries} - {entry['sha256'] for entry in kept}
+        for digest in stale:
+            try:
+                self._object_path(digest).unlink()
+                deleted += 1
+            except FileNotFoundError:
+                pass
+
+        if len(kept) != len(entries):
+            tmp = self.index_path.with_suffix('.jsonl.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                for entry in kept:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            os.replace(tmp, self.index_path)
+        return len(entries) - len(kept), deleted
+
+    def report(self) -> str:
+        return (f"stored={self.stats['stored']}, deduplicated={self.stats['deduplicated']}, "
+                f"written_kb={self.stats['bytes_written'] // 1024}")
@@ -0,0 +1,75 @@
+"""
+Process pool that parses result pages off the asyncio event loop.
+
+Browsers keep navigating while pages are parsed in worker processes, and the
+parsing of concurrently scraped platforms runs on all cores instead of one.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from .otomoto import OtomotoScraper
+from .olx import OLXScraper
+from .autoplac import AutoplacScraper
+
+# Platform name -> scraper class, so a worker can rebuild a scraper from its name
+SCRAPER_CLASSES = {
+    "otomoto": OtomotoScraper,
+    "olx": OLXScraper,
+    "autoplac": AutoplacScraper,
+}
+
+# One scraper per platform and worker process, built on first use
+_worker_scrapers = {}
+
+
+def parse_in_worker(platform: str, content: str, url: str, options: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Runs in a worker process: page HTML in, (listings, next page URL) out.
+    """
+    scraper = _worker_scrapers.get(platform)
+    if scraper is None:
+        scraper = _worker_scrapers[platform] = SCRAPER_CLASSES[platform]()
+    return scraper.parse_content(content, url, **options)
+
+
+class ParsePool:
+    """
+    Lazily started ProcessPoolExecutor shared by every scraper.
+
+    Workers are spawned rather than forked, since the parent holds the
+    Playwright driver's pipes and an event loop.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {"pages": 0, "listings": 0, "parse_seconds": 0.0}
+
+    async def parse(self, platform: str, content: str, url: str,
+                    options: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+        started = time.monotonic()
+        listings, next_url = await asyncio.get_running_loop().run_in_executor(
+            self._executor, parse_in_worker, platform, content, url, options
+        )
+        self.stats["pages"] += 1
+        self.stats["listings"] += len(listings)
+        self.stats["parse_seconds"] += time.monotonic() - started
+        return listings, next_url
+
+    def report(self) -> str:
+        pages = self.stats["pages"]
+        avg = self.stats["parse_seconds"] / pages if pages else 0.0
+        return (f"workers={self.max_workers}, pages={pages}, listings={self.stats['listings']}, "
+                f"avg_parse={avg * 1000:.1f}ms")
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
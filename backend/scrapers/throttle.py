@@ -0,0 +1,112 @@
+import asyncio
+import random
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+
+class RetryableError(Exception):
+    """
+    A page load that is worth retrying (429, 5xx or a timeout).
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class _Bucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+
+
+class DomainRateLimiter:
+    """
+    Token-bucket rate limiter keyed by domain, shared by every scraper and tab.
+
+    Each domain refills at `rate` requests per second up to `burst` tokens.
+    `backoff()` pauses a domain for an exponential, jittered delay after a
+    retryable failure, so the retry (and every other tab) waits it out.
+    """
+
+    def __init__(self, rate: float = 0.5, burst: int = 1, max_retries: int = 3,
+                 backoff_base: float = 2.0, backoff_max: float = 60.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.domain_limits: Dict[str, Dict[str, Any]] = {}
+        self._buckets: Dict[str, _Bucket] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def configure(self, config: Dict[str, Any]):
+        """
+        Applies the "rate_limit" section of scraper_config.json.
+        """
+        self.rate = config.get("rate", self.rate)
+        self.burst = config.get("burst", self.burst)
+        self.max_retries = config.get("max_retries", self.max_retries)
+        self.backoff_base = config.get("backoff_base", self.backoff_base)
+        self.backoff_max = config.get("backoff_max", self.backoff_max)
+        self.domain_limits = config.get("domains", self.domain_limits)
+        self._buckets.clear()
+
+    def _bucket(self, domain: str) -> _Bucket:
+        bucket = self._buckets.get(domain)
+        if bucket is None:
+            limits = self.domain_limits.get(domain, {})
+            bucket = _Bucket(limits.get("rate", self.rate), limits.get("burst", self.burst))
+            self._buckets[domain] = bucket
+        return bucket
+
+    def _domain_stats(self, domain: str) -> Dict[str, float]:
+        return self.stats.setdefault(domain, {"requests": 0, "wait_seconds": 0.0, "retries": 0})
+
+    async def wait(self, url: str):
+        domain = urlparse(url).netloc
+        bucket = self._bucket(domain)
+        stats = self._domain_stats(domain)
+        started = time.monotonic()
+
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with bucket.lock:
+            while True:
+                now = time.monotonic()
+                bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+                bucket.updated = now
+
+                if now < bucket.blocked_until:
+                    await asyncio.sleep(bucket.blocked_until - now)
+                    continue
+                if bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    break
+                await asyncio.sleep((1 - bucket.tokens) / bucket.rate)
+
+        stats["requests"] += 1
+        stats["wait_seconds"] += time.monotonic() - started
+
+    def backoff(self, url: str, attempt: int) -> float:
+        """
+        Pauses the whole domain before retry number `attempt` and returns the delay.
+        """
+        domain = urlparse(url).netloc
+        bucket = self._bucket(domain)
+        # Full jitter: uniform in [0, base * 2^attempt], capped
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+        bucket.tokens = 0
+        self._domain_stats(domain)["retries"] += 1
+        return delay
+
+    def report(self) -> str:
+        return "; ".join(
+            f"{domain}: requests={int(s['requests'])}, wait={s['wait_seconds']:.1f}s, retries={int(s['retries'])}"
+            for domain, s in self.stats.items()
+        )
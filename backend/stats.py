@@ -0,0 +1,253 @@
+"""
+Grouped price statistics for the charts.
+
+Unfiltered series are served from the daily rollups (rollups.py). The exact path computes
+them over the listings in SQL; its percentiles use nearest rank over window functions
+(ROW_NUMBER/COUNT OVER), which SQLite and PostgreSQL both run, instead of
+percentile_cont that SQLite lacks.
+
+Rebuild the rollups from the listings with:
+    python -m backend.stats --rebuild-rollups
+"""
+
+import argparse
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import func, case, or_
+from sqlalchemy.orm import Session
+from .models import Listing, DailyRollup
+from .queries import filter_listings
+from .rollups import ROLLUP_DIMENSIONS, ROLLUP_KEY, PriceSketch, RollupRow, RollupTable, build_rollups
+
+# Dimension name (also the key in the output rows) -> grouped expression
+DIMENSIONS = {
+    "year": Listing.production_year,
+    "brand": Listing.brand,
+    "model": Listing.model,
+    "date": func.date(Listing.scraped_at),
+    "platform": Listing.platform,
+    "fuel": Listing.fuel_type,
+}
+
+# Output name -> percentile
+PERCENTILES = {"p25Price": 25, "medianPrice": 50, "p75Price": 75, "p90Price": 90}
+
+# Distinct (dimension, filters) results kept per data version
+CACHE_SIZE = 256
+
+
+def price_stats(db: Session, dimension: str, dedupe: bool = True, **filters) -> List[Dict[str, Any]]:
+    """
+    Rows of {<dimension>, count, total, avgPrice, minPrice, maxPrice, p25Price, medianPrice,
+    p75Price, p90Price} per value of `dimension`, over priced listings matching `filters`
+    (see queries.filter_listings). With `dedupe`, a car listed on several platforms counts
+    once, like in the static export.
+    """
+    key = DIMENSIONS[dimension]
+    query = filter_listings(
+        db.query(
+            key.label("key"),
+            Listing.price.label("price"),
+            func.row_number().over(partition_by=key, order_by=Listing.price).label("rank"),
+            func.count().over(partition_by=key).label("size"),
+        ),
+        **filters,
+    ).filter(key.isnot(None), Listing.price.isnot(None))
+    if dedupe:
+        query = query.filter(or_(Listing.cluster_id.is_(None), Listing.cluster_id == Listing.source_id))
+    ranked = query.subquery()
+
+    # ceil(size * p / 100) in integer arithmetic: the nearest-rank position of percentile p
+    percentiles = [
+        func.max(case((ranked.c.rank == (ranked.c.size * p + 99) // 100, ranked.c.price))).label(name)
+        for name, p in PERCENTILES.items()
+    ]
+    rows = (
+        db.query(
+            ranked.c.key,
+            func.count().label("count"),
+            func.sum(ranked.c.price).label("total"),
+            func.min(ranked.c.price).label("minPrice"),
+            func.max(ranked.c.price).label("maxPrice"),
+            *percentiles,
+        )
+        .group_by(ranked.c.key)
+        .order_by(ranked.c.key)
+    )
+    return [
+        {
+            dimension: row.key,
+            "count": row.count,
+            "total": row.total,
+            "avgPrice": round(row.total / row.count),
+            "minPrice": row.minPrice,
+            "maxPrice": row.maxPrice,
+            **{name: getattr(row, name) for name in PERCENTILES},
+        }
+        for row in rows
+    ]
+
+
+def rollup_stats(db: Session, dimension: str) -> List[Dict[str, Any]]:
+    """
+    The unfiltered price_stats rows, merged from the daily rollups: each car once, at its
+    current price like price_stats, with percentiles within rollups.SKETCH_ACCURACY.
+
+    Count, sum, min and max are a GROUP BY over the rollups; only the price sketches of
+    the dimension's rows (a few dozen per day) are decoded and merged here.
+    """
+    rollups = db.query(DailyRollup).filter(DailyRollup.dimension == dimension)
+    sketches: Dict[str, PriceSketch] = defaultdict(PriceSketch)
+    for value, sketch in rollups.with_entities(DailyRollup.value, DailyRollup.sketch):
+        sketches[value].merge(PriceSketch.from_json(json.loads(sketch)))
+
+    groups = rollups.with_entities(
+        DailyRollup.value,
+        func.sum(DailyRollup.count).label("count"),
+        func.sum(DailyRollup.total).label("total"),
+        func.min(DailyRollup.min_price).label("min_price"),
+        func.max(DailyRollup.max_price).label("max_price"),
+    ).group_by(DailyRollup.value)
+    rows = []
+    for group in groups:
+        merged = RollupRow(group.count, group.total, group.min_price, group.max_price, sketches[group.value])
+        rows.append({
+            # Stored as text; years are integers like in the exact rows
+            dimension: int(group.value) if dimension == "year" else group.value,
+            "count": merged.count,
+            "total": merged.total,
+            "avgPrice": round(merged.total / merged.count),
+            "minPrice": merged.min_price,
+            "maxPrice": merged.max_price,
+            **{name: round(merged.quantile(p)) for name, p in PERCENTILES.items()},
+        })
+    return sorted(rows, key=lambda row: row[dimension])
+
+
+def save_rollups(db: Session, table: RollupTable):
+    """
+    Merges `table` into the stored rollups of its days and takes its removed prices out.
+    Runs after the listings are written, in the same transaction; the caller commits.
+    """
+    keys = set(table.rows) | set(table.removed)
+    if not keys:
+        return
+    stored = {
+        tuple(getattr(rollup, column) for column in ROLLUP_KEY): rollup
+        for rollup in db.query(DailyRollup).filter(DailyRollup.day.in_({key[0] for key in keys}))
+    }
+    for key in keys:
+        rollup = stored.get(key)
+        if rollup is None:
+            if key not in table.rows:
+                continue
+            rollup = DailyRollup(**dict(zip(ROLLUP_KEY, key)))
+            db.add(rollup)
+            merged = table.rows[key]
+        else:
+            merged = RollupRow(rollup.count, rollup.total, rollup.min_price, rollup.max_price,
+                               PriceSketch.from_json(json.loads(rollup.sketch)))
+            merged.merge(table.rows.get(key, RollupRow()))
+            # Removing the cheapest or dearest price leaves min/max to be found again
+            narrowed = False
+            for price in table.removed.get(key, ()):
+                merged.remove(price)
+                narrowed = narrowed or price in (merged.min_price, merged.max_price)
+            if merged.count <= 0:
+                db.delete(rollup)
+                continue
+            if narrowed:
+                merged.min_price, merged.max_price = _price_range(db, *key)
+        rollup.count = merged.count
+        rollup.total = merged.total
+        rollup.min_price = merged.min_price
+        rollup.max_price = merged.max_price
+        rollup.sketch = json.dumps(merged.sketch.to_json(), separators=(",", ":"))
+
+
+def _price_range(db: Session, day: str, dimension: str, value: str) -> Tuple[Optional[float], Optional[float]]:
+    # The rolled-up listings of one rollup row; a range on scraped_at so the day is an index scan
+    start = datetime.fromisoformat(day)
+    query = db.query(func.min(Listing.price), func.max(Listing.price)).filter(
+        Listing.scraped_at >= start,
+        Listing.scraped_at < start + timedelta(days=1),
+        Listing.price > 0,
+        or_(Listing.cluster_id.is_(None), Listing.cluster_id == Listing.source_id),
+    )
+    field = ROLLUP_DIMENSIONS[dimension]
+    if field:
+        query = query.filter(getattr(Listing, field) == (int(value) if dimension == "year" else value))
+    low, high = query.one()
+    return low, high
+
+
+def rebuild_rollups(db: Session) -> int:
+    """
+    Recomputes every rollup from the listings' current prices. Returns the number of rollup rows.
+    """
+    rows = db.query(
+        Listing.source_id, Listing.cluster_id, Listing.price,
+        *(getattr(Listing, field) for field in ROLLUP_DIMENSIONS.values() if field),
+        func.date(Listing.scraped_at).label("day"),
+    ).yield_per(10000)
+    table = build_rollups((row._asdict(), str(row.day)) for row in rows)
+
+    db.query(DailyRollup).delete()
+    save_rollups(db, table)
+    db.commit()
+    return len(table)
+
+
+class StatsCache:
+    """
+    Results keyed by request, valid for one data version (the /listings ETag).
+
+    Every ingest that adds or changes a listing writes a snapshot and so moves the
+    version; until then, repeated chart requests skip the GROUP BY entirely.
+    Shared by the sync endpoints, which FastAPI runs in a thread pool.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self.version: Optional[str] = None
+        self.entries: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def get(self, version: str, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if version != self.version:
+                self.version = version
+                self.entries.clear()
+            rows = self.entries.get(key)
+            if rows is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.entries.move_to_end(key)
+            return rows
+
+    def put(self, version: str, key: Tuple, rows: List[Dict[str, Any]]):
+        with self._lock:
+            if version != self.version:
+                return
+            self.entries[key] = rows
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+
+if __name__ == "__main__":
+    from .database import SessionLocal, Base, engine, upgrade_schema
+
+    parser = argparse.ArgumentParser(description="Maintain the analytics tables")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="Recompute the daily rollups from the listings")
+    args = parser.parse_args()
+    if args.rebuild_rollups:
+        upgrade_schema(engine, Base.metadata)
+        with SessionLocal() as db:
+            print(f"Rebuilt {rebuild_rollups(db)} daily rollup rows")
+    else:
+        parser.print_help()
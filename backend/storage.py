@@ -0,0 +1,315 @@
+"""
+Append-only listing storage: JSON Lines segments partitioned by date plus a small manifest.
+
+Layout of a store directory:
+    manifest.json               segment list with record counts
+    index.jsonl                 [source_id, price, mileage, status, scraped_at], appended on every new/changed listing
+    clusters.jsonl              [source_id, cluster_id, *FINGERPRINT_FIELDS] per listing, see dedup.py
+    segments/YYYY-MM-DD.jsonl   listings first seen that day (YYYY-MM.jsonl once compacted)
+    history/YYYY-MM-DD.jsonl    price/mileage/status changes seen that day (YYYY-MM.jsonl once compacted)
+"""
+
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from dedup import DuplicateIndex, FINGERPRINT_FIELDS
+
+# Fields whose changes are recorded in the history segments
+TRACKED_FIELDS = ('price', 'mileage', 'status')
+
+MANIFEST_VERSION = 1
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _read_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _apply_change(record: Dict[str, Any], change: Optional[Dict[str, Any]]):
+    # A change dated before the record was first seen (a replayed older page) is history only
+    if change and change['scraped_at'] >= (record.get('scraped_at') or ''):
+        record.update({field: change[field] for field in TRACKED_FIELDS if change[field] is not None})
+
+
+class SegmentStore:
+    """
+    Listing storage whose save cost scales with the number of new or changed listings.
+
+    `append()` only appends to today's segment files and rewrites the small
+    manifest. `compact()` merges daily segments into monthly ones and folds
+    the recorded changes into the listing records.
+    """
+
+    def __init__(self, root: str, legacy_path: Optional[str] = None):
+        self.root = Path(root)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self._index: Optional[Dict[str, Tuple[Any, Any, Any]]] = None
+        # source_id -> scraped_at of the state in the index
+        self._seen_at: Dict[str, str] = {}
+        self._duplicates: Optional[DuplicateIndex] = None
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / 'manifest.json'
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / 'index.jsonl'
+
+    @property
+    def clusters_path(self) -> Path:
+        return self.root / 'clusters.jsonl'
+
+    def load_manifest(self) -> Dict[str, Any]:
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'version': MANIFEST_VERSION, 'total': 0, 'segments': [], 'history': []}
+
+    def save_manifest(self, manifest: Dict[str, Any]):
+        manifest['updated_at'] = datetime.now().isoformat()
+        _write_atomic(self.manifest_path, json.dumps(manifest, ensure_ascii=False, separators=(',', ':')))
+
+    def load_index(self) -> Dict[str, Tuple[Any, Any, Any]]:
+        """
+        Latest (price, mileage, status) per known source_id.
+        """
+        if self._index is None:
+            self._index = {}
+            if self.index_path.exists():
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            source_id, price, mileage, status, seen_at = json.loads(line)
+                            self._index[source_id] = (price, mileage, status)
+                            self._seen_at[source_id] = seen_at
+        return self._index
+
+    def load_duplicates(self) -> DuplicateIndex:
+        """
+        Cross-platform duplicate index of every stored listing.
+        """
+        if self._duplicates is None:
+            self._duplicates = DuplicateIndex()
+            if self.clusters_path.exists():
+                with open(self.clusters_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            source_id, cluster_id, *values = json.loads(line)
+                            self._duplicates.add({'source_id': source_id, **dict(zip(FINGERPRINT_FIELDS, values))}, cluster_id)
+        return self._duplicates
+
+    def _append_clusters(self, records: List[Dict[str, Any]]):
+        with open(self.clusters_path, 'a', encoding='utf-8') as f:
+            for record in records:
+                values = [record.get(field) for field in FINGERPRINT_FIELDS]
+                f.write(json.dumps([record['source_id'], record['cluster_id'], *values], ensure_ascii=False) + '\n')
+
+    def _ensure_initialized(self):
+        if self.manifest_path.exists():
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / 'segments').mkdir(exist_ok=True)
+        (self.root / 'history').mkdir(exist_ok=True)
+
+        # Import the old single-file listings.json once
+        if self.legacy_path and self.legacy_path.exists():
+            try:
+                with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                    legacy = json.load(f)
+            except:
+                legacy = []
+            if legacy:
+                print(f"Importing {len(legacy)} listings from {self.legacy_path}")
+                today = datetime.now().strftime('%Y-%m-%d')
+                by_day = defaultdict(list)
+                for record in legacy:
+                    if record.get('source_id'):
+                        by_day[(record.get('scraped_at') or today)[:10]].append(record)
+                manifest = self.load_manifest()
+                for day in sorted(by_day):
+                    self._append_records(by_day[day], [], manifest, day)
+                return
+        self.save_manifest(self.load_manifest())
+
+    def append(self, results: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Appends new listings and changes to re-seen ones. Returns (new, changed) counts.
+
+        A result's scraped_at (the fetch time of a replayed page) dates the listing or
+        change and picks its day file; results without one are stamped with now. A result
+        older than the stored state only goes to the history: the index and compaction
+        keep the newer values. A tracked field the result leaves out or has no value for
+        (None) keeps its stored value.
+        """
+        self._ensure_initialized()
+        index = self.load_index()
+        now = datetime.now().isoformat()
+
+        new_results = defaultdict(list)
+        changes = defaultdict(list)
+        seen = set()
+        for result in results:
+            source_id = result.get('source_id')
+            if not source_id or source_id in seen:
+                continue
+            seen.add(source_id)
+            timestamp = result.get('scraped_at') or now
+
+            current = index.get(source_id)
+            if current is None:
+                result['scraped_at'] = timestamp
+                new_results[timestamp[:10]].append(result)
+                continue
+
+            previous = dict(zip(TRACKED_FIELDS, current))
+            values = {field: previous[field] if result.get(field) is None else result[field]
+                      for field in TRACKED_FIELDS}
+            if values == previous:
+                continue
+            changes[timestamp[:10]].append({
+                'source_id': source_id,
+                'scraped_at': timestamp,
+                **values,
+                'previous_price': previous['price'],
+                'previous_mileage': previous['mileage'],
+            })
+
+        if new_results or changes:
+            manifest = self.load_manifest()
+            for day in sorted(set(new_results) | set(changes)):
+                self._append_records(new_results.get(day, []), changes.get(day, []), manifest, day)
+        return sum(map(len, new_results.values())), sum(map(len, changes.values()))
+
+    def _append_records(self, new_results: List[Dict[str, Any]], changes: List[Dict[str, Any]],
+                        manifest: Dict[str, Any], day: str):
+        index = self.load_index()
+        index_lines = []
+
+        if new_results:
+            # Before the segment write, so the records carry their cluster ID
+            self.load_duplicates().assign(new_results)
+            self._append_clusters(new_results)
+            self._append_jsonl('segments', day, new_results, manifest['segments'])
+            manifest['total'] += len(new_results)
+            for result in new_results:
+                values = tuple(result.get(field) for field in TRACKED_FIELDS)
+                index[result['source_id']] = values
+                # Imported legacy records may lack scraped_at
+                self._seen_at[result['source_id']] = result.get('scraped_at') or ''
+                index_lines.append([result['source_id'], *values, self._seen_at[result['source_id']]])
+
+        if changes:
+            self._append_jsonl('history', day, changes, manifest['history'])
+            for change in changes:
+                if change['scraped_at'] < self._seen_at.get(change['source_id'], ''):
+                    continue
+                values = tuple(change[field] for field in TRACKED_FIELDS)
+                index[change['source_id']] = values
+                self._seen_at[change['source_id']] = change['scraped_at']
+                index_lines.append([change['source_id'], *values, change['scraped_at']])
+
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            for line in index_lines:
+                f.write(json.dumps(line, ensure_ascii=False) + '\n')
+        self.save_manifest(manifest)
+
+    def _append_jsonl(self, kind: str, day: str, records: List[Dict[str, Any]], entries: List[Dict[str, Any]]):
+        name = f"{kind}/{day}.jsonl"
+        (self.root / kind).mkdir(parents=True, exist_ok=True)
+        with open(self.root / name, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        entry = next((e for e in entries if e['name'] == name), None)
+        if entry is None:
+            entry = {'name': name, 'count': 0}
+            entries.append(entry)
+        entry['count'] += len(records)
+
+    def iter_listings(self) -> Iterator[Dict[str, Any]]:
+        """
+        Every stored listing with its latest recorded price, mileage and status, the same
+        before and after compact().
+        """
+        latest = self.latest_changes()
+        for entry in self.load_manifest()['segments']:
+            for record in _read_jsonl(self.root / entry['name']):
+                _apply_change(record, latest.get(record.get('source_id')))
+                yield record
+
+    def iter_changes(self) -> Iterator[Dict[str, Any]]:
+        for entry in self.load_manifest()['history']:
+            yield from _read_jsonl(self.root / entry['name'])
+
+    def latest_changes(self) -> Dict[str, Dict[str, Any]]:
+        """
+        The most recent recorded change per source_id, by scraped_at: a replayed page
+        can append a change dated before ones already recorded.
+        """
+        latest = {}
+        for change in self.iter_changes():
+            known = latest.get(change['source_id'])
+            if known is None or change['scraped_at'] >= known['scraped_at']:
+                latest[change['source_id']] = change
+        return latest
+
+    def compact(self):
+        """
+        Merges daily segments into monthly ones, folds recorded changes into
+        the listing records and rewrites the index without superseded lines.
+        """
+        self._ensure_initialized()
+        manifest = self.load_manifest()
+
+        latest = self.latest_changes()
+
+        manifest['segments'] = self._merge_monthly(manifest['segments'], 'segments', latest)
+        manifest['history'] = self._merge_monthly(manifest['history'], 'history')
+
+        index = self.load_index()
+        _write_atomic(self.index_path, ''.join(
+            json.dumps([source_id, *values, self._seen_at[source_id]], ensure_ascii=False) + '\n'
+            for source_id, values in index.items()
+        ))
+        self.save_manifest(manifest)
+        print(f"✓ Compacted store: {len(manifest['segments'])} listing segments, "
+              f"{len(manifest['history'])} history segments, {manifest['total']} listings")
+
+    def _merge_monthly(self, entries: List[Dict[str, Any]], kind: str,
+                       latest: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        by_month = defaultdict(list)
+        for entry in entries:
+            month = Path(entry['name']).stem[:7]
+            by_month[month].append(entry)
+
+        merged = []
+        for month in sorted(by_month):
+            name = f"{kind}/{month}.jsonl"
+            records = []
+            for entry in by_month[month]:
+                records.extend(_read_jsonl(self.root / entry['name']))
+
+            if latest is not None:
+                for record in records:
+                    _apply_change(record, latest.get(record.get('source_id')))
+
+            _write_atomic(self.root / name, ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records))
+            for entry in by_month[month]:
+                if entry['name'] != name:
+                    (self.root / entry['name']).unlink()
+            merged.append({'name': name, 'count': len(records)})
+        return merged
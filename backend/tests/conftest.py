@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The backend's modules import each other as top-level packages (scrapers, storage, ...),
+# the way cli.py runs them from the backend directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,59 @@
+"""
+SegmentStore: new listings, recorded changes and what compaction folds into the records.
+"""
+
+from storage import SegmentStore
+
+
+def listing(price, scraped_at=None, **fields):
+    record = {"source_id": "ID1", "platform": "olx", "brand": "BMW", "model": "X3", "price": price, **fields}
+    if scraped_at:
+        record["scraped_at"] = scraped_at
+    return record
+
+
+def test_change_updates_index_and_compacted_record(tmp_path):
+    store = SegmentStore(str(tmp_path / "store"))
+    assert store.append([listing(100, "2026-09-01T10:00:00")]) == (1, 0)
+    assert store.append([listing(80, "2026-09-10T10:00:00")]) == (0, 1)
+
+    assert store.load_index()["ID1"][0] == 80
+    store.compact()
+    assert [record["price"] for record in store.iter_listings()] == [80]
+
+
+def test_listings_carry_changes_before_compaction(tmp_path):
+    store = SegmentStore(str(tmp_path / "store"))
+    store.append([listing(100, "2026-09-01T10:00:00", mileage=150000)])
+    store.append([listing(80, "2026-09-10T10:00:00", mileage=150000)])
+
+    before = list(store.iter_listings())
+    store.compact()
+    assert [(record["price"], record["mileage"]) for record in before] == [(80, 150000)]
+    assert list(store.iter_listings()) == before
+
+
+def test_replayed_older_page_only_goes_to_history(tmp_path):
+    store = SegmentStore(str(tmp_path / "store"))
+    store.append([listing(100, "2026-09-01T10:00:00")])
+    store.append([listing(80, "2026-09-10T10:00:00")])
+    # A cached page from 09-05 still showing the old price
+    assert store.append([listing(100, "2026-09-05T10:00:00")]) == (0, 1)
+
+    assert [change["price"] for change in store.iter_changes()] == [80, 100]
+    assert store.load_index()["ID1"][0] == 80
+    # Survives a reload of the index from disk and the compaction
+    assert SegmentStore(str(tmp_path / "store")).load_index()["ID1"][0] == 80
+    store.compact()
+    assert SegmentStore(str(tmp_path / "store")).load_index()["ID1"][0] == 80
+    assert [record["price"] for record in store.iter_listings()] == [80]
+
+
+def test_missing_price_keeps_stored_value(tmp_path):
+    store = SegmentStore(str(tmp_path / "store"))
+    store.append([listing(100, "2026-09-01T10:00:00")])
+    assert store.append([listing(None, "2026-09-10T10:00:00")]) == (0, 0)
+
+    assert store.append([listing(None, "2026-09-11T10:00:00", mileage=90000)]) == (0, 1)
+    assert [(change["price"], change["mileage"]) for change in store.iter_changes()] == [(100, 90000)]
+    assert store.load_index()["ID1"][0] == 100
@@ -1,10 +1,51 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { Car, BarChart3, Search } from 'lucide-react'
 import ListingsTable from './components/ListingsTable'
 import Charts from './components/Charts'
 
+// Reads a JSON shard that may still be gzip-compressed (GitHub Pages serves .gz files as-is)
+const fetchGzipJson = async (url) => {
+    const res = await fetch(url)
+    if (!res.ok) throw new Error(`Failed to fetch ${url}: ${res.status}`)
+
+    const buffer = await res.arrayBuffer()
+    const bytes = new Uint8Array(buffer)
+    if (bytes[0] === 0x1f && bytes[1] === 0x8b) {
+        const stream = new Blob([buffer]).stream().pipeThrough(new DecompressionStream('gzip'))
+        return JSON.parse(await new Response(stream).text())
+    }
+    return JSON.parse(new TextDecoder().decode(bytes))
+}
+
+// Loads the static export written by `cli.py export`: only the latest month's shards are fetched
+const loadExport = async (baseUrl) => {
+    const indexRes = await fetch(`${baseUrl}index.json`)
+    if (!indexRes.ok) return null
+
+    const index = await indexRes.json()
+    const latestMonth = index.shards.reduce((latest, shard) => shard.month > latest ? shard.month : latest, '')
+    const shards = index.shards.filter(shard => shard.month === latestMonth)
+    const rows = await Promise.all(shards.map(shard => fetchGzipJson(`${baseUrl}${shard.path}`)))
+    return { total: index.total, listings: rows.flat() }
+}
+
+// Loads the append-only store written by the scraper CLI: a manifest plus JSON Lines segments
+const loadStore = async (baseUrl) => {
+    const manifestRes = await fetch(`${baseUrl}manifest.json`)
+    if (!manifestRes.ok) return null
+
+    const manifest = await manifestRes.json()
+    const segments = await Promise.all(manifest.segments.map(async (segment) => {
+        const res = await fetch(`${baseUrl}${segment.name}`)
+        const text = await res.text()
+        return text.split('\n').filter(line => line.trim()).map(line => JSON.parse(line))
+    }))
+    return segments.flat()
+}
+
 function App() {
     const [listings, setListings] = useState([])
+    const [totalListings, setTotalListings] = useState(null)
     const [loading, setLoading] = useState(false)
     const [searchUrl, setSearchUrl] = useState("")
 
@@ -14,6 +55,21 @@ function App() {
 
             // Try static data first (for GitHub Pages deployment)
             try {
+                const exported = await loadExport(`${import.meta.env.BASE_URL}data/export/`)
+                if (exported) {
+                    setListings(exported.listings)
+                    setTotalListings(exported.total)
+                    console.log('Loaded data from static export')
+                    return
+                }
+
+                const storeData = await loadStore(`${import.meta.env.BASE_URL}data/store/`)
+                if (storeData) {
+                    setListings(storeData)
+                    console.log('Loaded data from static store')
+                    return
+                }
+
                 // Użyj import.meta.env.BASE_URL aby pobrać właściwą ścieżkę bazową
                 const staticRes = await fetch(`${import.meta.env.BASE_URL}data/listings.json`)
                 if (staticRes.ok) {
@@ -51,9 +107,29 @@ function App() {
         }
     }
 
-    useEffect(() => {
+    // Only refetch the data when the export's content hash changed since the last poll
+    const dataVersion = useRef(null)
+    // Bumped on every refetch, so the charts reload their series along with the table
+    const [version, setVersion] = useState(null)
+
+    const pollListings = async () => {
+        try {
+            const res = await fetch(`${import.meta.env.BASE_URL}data/export/version.json`, { cache: 'no-cache' })
+            if (res.ok) {
+                const version = await res.json()
+                if (version.hash === dataVersion.current) return
+                dataVersion.current = version.hash
+            }
+        } catch (error) {
+            // No static export; the API answers 304 while nothing changed
+        }
+        setVersion(dataVersion.current ?? Date.now())
         fetchListings()
-        const interval = setInterval(fetchListings, 10000) // Poll every 10s
+    }
+
+    useEffect(() => {
+        pollListings()
+        const interval = setInterval(pollListings, 10000) // Poll every 10s
         return () => clearInterval(interval)
     }, [])
 
@@ -70,7 +146,7 @@ function App() {
                 </div>
                 <div className="flex items-center gap-4">
                     <div className="text-sm text-slate-500">
-                        Total Listings: <span className="font-bold text-slate-900">{listings.length}</span>
+                        Total Listings: <span className="font-bold text-slate-900">{totalListings ?? listings.length}</span>
                     </div>
                 </div>
             </header>
@@ -102,7 +178,7 @@ function App() {
 
                 {/* Charts Section */}
                 <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
-                    <Charts listings={listings} />
+                    <Charts listings={listings} version={version} />
                 </div>
 
                 {/* Data Table */}
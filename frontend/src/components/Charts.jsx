@@ -1,9 +1,34 @@
-import React, { useMemo } from 'react'
+import React, { useMemo, useState, useEffect } from 'react'
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, ScatterChart, Scatter, LineChart, Line, Legend } from 'recharts'
 
-const Charts = ({ listings }) => {
+// Pre-aggregated series written by `cli.py export`; used instead of reducing over every listing
+const SUMMARY_NAMES = ['price_by_year', 'price_by_date', 'price_by_fuel', 'price_vs_mileage']
+
+// Without a static export, the same series come from the API's /stats endpoints (SQL GROUP BY)
+const API_STATS = { price_by_year: 'year', price_by_date: 'date', price_by_fuel: 'fuel' }
+
+// Revalidated on every load: summaries and /stats answer 304 until the data changes
+const fetchJson = (url) => fetch(url, { cache: 'no-cache' }).then(res => res.ok ? res.json() : Promise.reject(res.status))
+
+const loadSeries = (names, urlFor) =>
+    Promise.all(names.map(name => fetchJson(urlFor(name))))
+        .then(results => Object.fromEntries(names.map((name, i) => [name, results[i]])))
+
+const Charts = ({ listings, version }) => {
+    const [summaries, setSummaries] = useState(null)
+
+    // Reloaded whenever App sees a new data version, so the charts never lag the table
+    useEffect(() => {
+        if (version === null) return
+        const baseUrl = `${import.meta.env.BASE_URL}data/export/summary/`
+        loadSeries(SUMMARY_NAMES, name => `${baseUrl}${name}.json`)
+            .catch(() => loadSeries(Object.keys(API_STATS), name => `/api/stats/${API_STATS[name]}`))
+            .then(setSummaries)
+            .catch(() => setSummaries(null))
+    }, [version])
 
     const priceByYear = useMemo(() => {
+        if (summaries) return summaries.price_by_year;
         if (!listings.length) return [];
 
         const grouped = listings.reduce((acc, curr) => {
@@ -19,10 +44,11 @@ const Charts = ({ listings }) => {
         return Object.values(grouped)
             .map(g => ({ ...g, avgPrice: Math.round(g.total / g.count) }))
             .sort((a, b) => a.year - b.year)
-    }, [listings])
+    }, [listings, summaries])
 
     // Historical price tracking (by scraped_at date)
     const priceOverTime = useMemo(() => {
+        if (summaries) return summaries.price_by_date;
         if (!listings.length) return [];
 
         const grouped = listings.reduce((acc, curr) => {
@@ -42,10 +68,11 @@ const Charts = ({ listings }) => {
         return Object.values(grouped)
             .map(g => ({ ...g, avgPrice: Math.round(g.total / g.count) }))
             .sort((a, b) => a.date.localeCompare(b.date))
-    }, [listings])
+    }, [listings, summaries])
 
     // Price by fuel type
     const priceByFuel = useMemo(() => {
+        if (summaries) return [...summaries.price_by_fuel].sort((a, b) => b.avgPrice - a.avgPrice);
         if (!listings.length) return [];
 
         const grouped = listings.reduce((acc, curr) => {
@@ -62,7 +89,10 @@ const Charts = ({ listings }) => {
         return Object.values(grouped)
             .map(g => ({ ...g, avgPrice: Math.round(g.total / g.count) }))
             .sort((a, b) => b.avgPrice - a.avgPrice)
-    }, [listings])
+    }, [listings, summaries])
+
+    // The API has no scatter sample; the listings already loaded stand in for it
+    const priceVsMileage = summaries?.price_vs_mileage ?? listings
 
     return (
         <>
@@ -116,7 +146,7 @@ const Charts = ({ listings }) => {
                             <XAxis type="number" dataKey="mileage" name="Mileage" unit="km" fontSize={12} tickLine={false} axisLine={false} />
                             <YAxis type="number" dataKey="price" name="Price" unit="PLN" fontSize={12} tickLine={false} axisLine={false} tickFormatter={(value) => `${value / 1000}k`} />
                             <Tooltip cursor={{ strokeDasharray: '3 3' }} />
-                            <Scatter name="Listings" data={listings} fill="#8B5CF6" fillOpacity={0.6} />
+                            <Scatter name="Listings" data={priceVsMileage} fill="#8B5CF6" fillOpacity={0.6} />
                         </ScatterChart>
                     </ResponsiveContainer>
                 </div>